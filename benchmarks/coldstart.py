@@ -0,0 +1,147 @@
+''' Measures cold starts of generated CLIs, and checks them against budgets
+
+Generates apps of increasing numbers of commands, and runs each one as a
+real subprocess a few times, once bytecode is cached. Reports the median wall
+time, the time taken importing amersham (from '-X importtime') and peak
+memory, and exits with an error if any exceed their budgets
+
+usage
+  python3 benchmarks/coldstart.py [COMMANDS ...]
+'''
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Median wall time (ms), amersham import time (ms) and peak RSS (MiB)
+budgets = {
+    10: (150, 40, 30),
+    100: (200, 40, 30),
+    1000: (400, 40, 40),
+}
+
+runs = 5
+
+
+def generate(path: str, command_count: int):
+    lines = [
+        "import sys",
+        "",
+        "from amersham import Parser",
+        "",
+        "parser = Parser('app')",
+        "",
+    ]
+    for index in range(command_count):
+        lines += [
+            f"@parser.command(description='command number {index}')",
+            f"def command_{index}(path: str, force = None, retries = 0):",
+            "    return path",
+            "",
+        ]
+    lines += [
+        "if __name__ == '__main__':",
+        "    parser.run(sys.argv[1:])",
+    ]
+
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def launch(arguments: list, directory: str, errors: any) -> tuple:
+    ''' Runs a subprocess, returning its wall time (s) and peak RSS (KiB) '''
+
+    # Installed CLIs run from cached bytecode
+    environment = dict(os.environ)
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    source = os.path.join(os.path.dirname(__file__), "..", "source")
+    environment["PYTHONPATH"] = os.pathsep.join([os.path.abspath(source),
+            directory])
+
+    start = time.perf_counter()
+    process = subprocess.Popen(arguments,
+            stdout=subprocess.DEVNULL,
+            stderr=errors,
+            env=environment)
+    _, status, usage = os.wait4(process.pid, 0)
+    duration = time.perf_counter() - start
+    process.returncode = os.WEXITSTATUS(status)
+
+    if not os.WIFEXITED(status) or process.returncode:
+        raise Exception(f"{' '.join(arguments)} failed")
+    return (duration, usage.ru_maxrss)
+
+
+def import_time(arguments: list, directory: str) -> float:
+    ''' Runs an app with '-X importtime', returning amersham's share (s) '''
+
+    with tempfile.TemporaryFile("w+") as errors:
+        launch([sys.executable, "-X", "importtime"] + arguments,
+                directory,
+                errors)
+        errors.seek(0)
+        for line in errors:
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == "amersham":
+                return int(fields[1]) / 1e6
+    raise Exception("amersham import not found")
+
+
+def measure(directory: str, command_count: int) -> tuple:
+    module = f"app_{command_count}"
+    generate(os.path.join(directory, f"{module}.py"), command_count)
+    arguments = ["-m", module, "command-0", "x"]
+
+    # Warm the filesystem and bytecode caches first
+    launch([sys.executable] + arguments, directory, subprocess.DEVNULL)
+
+    durations = []
+    memory = 0
+    for _ in range(runs):
+        duration, rss = launch([sys.executable] + arguments,
+                directory,
+                subprocess.DEVNULL)
+        durations.append(duration)
+        memory = max(memory, rss)
+
+    imports = statistics.median(import_time(arguments, directory)
+            for _ in range(runs))
+    return (statistics.median(durations), imports, memory / 1024)
+
+
+def main():
+    command_counts = [int(count) for count in sys.argv[1:]] or list(budgets)
+    print(f"python {sys.version.split()[0]}")
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        for command_count in command_counts:
+            wall, imports, memory = measure(directory, command_count)
+            print(f"{command_count:>5} commands  {wall * 1000:>7.1f} ms  "
+                    f"import {imports * 1000:>5.1f} ms  {memory:>6.1f} MiB")
+
+            if command_count not in budgets:
+                continue
+            wall_budget, import_budget, memory_budget = budgets[command_count]
+            if wall * 1000 > wall_budget:
+                failures.append(f"{command_count} commands: wall time over "
+                        f"{wall_budget} ms")
+            if imports * 1000 > import_budget:
+                failures.append(f"{command_count} commands: import time over "
+                        f"{import_budget} ms")
+            if memory > memory_budget:
+                failures.append(f"{command_count} commands: memory over "
+                        f"{memory_budget} MiB")
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+''' Measures parsing throughput as threads share one frozen parser
+
+Runs a fixed number of invocations per thread, for increasing thread counts,
+and reports throughput relative to a single thread. Scaling is only linear on
+free-threaded builds; with the GIL, throughput stays roughly flat
+
+usage
+  python3 benchmarks/threads.py [THREADS ...]
+'''
+
+import sys
+import threading
+import time
+
+from amersham import Parser, Context
+
+
+def build() -> Parser:
+    parser = Parser("bench")
+
+    @parser.command()
+    def copy(source: str,
+            destination: str,
+            force = None,
+            retries = 0,
+            tags = []):
+        return (source, destination, force, retries, tags)
+
+    @parser.command()
+    def remove(path: str, recursive = None):
+        return path
+
+    parser.freeze()
+    return parser
+
+
+def measure(parser: Parser, thread_count: int, iterations: int) -> float:
+    arguments = [
+        ["copy", "--force", "--retries=3", "--tags=a,b,c", "in", "out"],
+        ["remove", "--recursive", "path"],
+    ]
+    context = Context(raise_exceptions=True)
+
+    def run():
+        for index in range(iterations):
+            parser.run(arguments[index % 2], context)
+
+    threads = [threading.Thread(target=run) for _ in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+
+    return thread_count * iterations / duration
+
+
+def main():
+    thread_counts = [int(count) for count in sys.argv[1:]] or [1, 2, 4, 8]
+    iterations = 20000
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, gil {'on' if gil else 'off'}")
+
+    parser = build()
+    baseline = None
+    for thread_count in thread_counts:
+        throughput = measure(parser, thread_count, iterations)
+        baseline = baseline or throughput
+        scaling = throughput / baseline
+        print(f"{thread_count:>3} threads  {throughput:>10.0f} runs/s  "
+                f"{scaling:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,32 @@ from .parser import Parser
 from .command import Command
 from .flag import Flag
 from .parameter import Parameter
+from .file import File
+from .cache import Cache
+from .trace import Tracer
+from .context import Context
+from .parse_result import ParseResult
+from .parallel import Parallel
+from .stream import Stream
+from .unit import Size, Duration, Rate
 
 from .parse_exception import ParseException
 
 
-__all__ = ["Parser", "Command", "Flag", "Parameter", "ParseException"]
+__all__ = [
+    "Parser",
+    "Command",
+    "Flag",
+    "Parameter",
+    "ParseException",
+    "Stream",
+    "File",
+    "Cache",
+    "Tracer",
+    "Context",
+    "ParseResult",
+    "Parallel",
+    "Size",
+    "Duration",
+    "Rate",
+]
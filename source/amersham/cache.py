@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import collections
+import enum
+import os
+import pathlib
+import threading
+import time
+
+from .storage import write as storage_write
+
+
+class Cache:
+
+    def __init__(self,
+            size: int = 128,
+            ttl: float = None,
+            path: str = "",
+            mtime: list = []):
+
+        if size < 0:
+            raise Exception(f"cache size ({size}) invalid")
+        if ttl is not None and ttl <= 0:
+            raise Exception(f"cache ttl ({ttl}) invalid")
+
+        self.size = size
+        self.ttl = ttl
+        self.path = path
+        self.mtime = list(mtime)
+
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def canonicalize(value: any) -> any:
+        ''' Converts an argument value to a hashable, stably printed form
+
+        Arguments
+        ---------
+        value: any
+            the cast argument value
+
+        Returns
+        -------
+        value: any
+            the canonical value, or the cache itself as a sentinel if the
+            value can't be part of a key (an open file, say)
+        '''
+
+        if isinstance(value, enum.Enum):
+            return (type(value).__qualname__, value.name)
+        elif value is None or isinstance(value, (str, int, float, bytes)):
+            return value
+        elif isinstance(value, pathlib.PurePath):
+            return os.fspath(value)
+        elif isinstance(value, (list, tuple)):
+            values = tuple(Cache.canonicalize(item) for item in value)
+            return Cache if Cache in values else values
+        elif isinstance(value, dict):
+            items = tuple(sorted(value.items()))
+            return Cache.canonicalize(items)
+        return Cache
+
+    @staticmethod
+    def copy(value: any) -> any:
+        ''' Copies a result, so callers can't change the cached one
+
+        Arguments
+        ---------
+        value: any
+            the result
+
+        Returns
+        -------
+        value: any
+            a deep copy; immutable scalars, and results that can't be copied,
+            are returned as they are
+        '''
+
+        if value is None or isinstance(value,
+                (str, int, float, bool, bytes, enum.Enum)):
+            return value
+
+        import copy
+        try:
+            return copy.deepcopy(value)
+        except Exception:
+            return value
+
+    def key(self, name: str, pack: dict) -> tuple:
+        ''' Builds a cache key for a command invocation
+
+        Arguments
+        ---------
+        name: str
+            a name identifying the command
+        pack: dict
+            the cast arguments, as passed to the callback
+
+        Returns
+        -------
+        key: tuple
+            the key, or None if some argument can't be cached
+        '''
+
+        items = []
+        for argument, value in sorted(pack.items()):
+            value = Cache.canonicalize(value)
+            if value is Cache:
+                return None
+            items.append((argument, value))
+
+            # Paths invalidate entries when the file they name changes
+            if argument in self.mtime and value is not None:
+                try:
+                    status = os.stat(value)
+                    modified = (status.st_mtime_ns, status.st_size)
+                    items.append((argument, modified))
+                except (OSError, TypeError, ValueError):
+                    items.append((argument, None))
+
+        return (name, tuple(items))
+
+    def expired(self, timestamp: float) -> bool:
+        ''' Checks if an entry stored at a given time has expired
+
+        Arguments
+        ---------
+        timestamp: float
+            when the entry was stored
+
+        Returns
+        -------
+        expired: bool
+            if the entry is older than the time-to-live
+        '''
+
+        return self.ttl is not None and time.time() - timestamp > self.ttl
+
+    def get(self, key: tuple) -> tuple:
+        ''' Looks up a cached result, in memory then on disk
+
+        Arguments
+        ---------
+        key: tuple
+            the entry's key
+
+        Returns
+        -------
+        hit, value: tuple[bool, any]
+            if the entry was present and fresh, and a copy of its value
+        '''
+
+        with self.lock:
+            if key in self.entries:
+                timestamp, value = self.entries[key]
+                if not self.expired(timestamp):
+                    self.entries.move_to_end(key)
+                    return (True, Cache.copy(value))
+                del self.entries[key]
+
+        if not self.path:
+            return (False, None)
+
+        import pickle
+        try:
+            with open(self.file(key), "rb") as file:
+                timestamp, value = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return (False, None)
+        if self.expired(timestamp):
+            return (False, None)
+
+        self.store(key, timestamp, value)
+        return (True, Cache.copy(value))
+
+    def put(self, key: tuple, value: any):
+        ''' Stores a result, in memory and on disk
+
+        Results that can't be pickled are only kept in memory; a copy's kept,
+        so the caller can go on changing the result
+
+        Arguments
+        ---------
+        key: tuple
+            the entry's key
+        value: any
+            the result to store
+        '''
+
+        timestamp = time.time()
+        value = Cache.copy(value)
+        self.store(key, timestamp, value)
+
+        if not self.path:
+            return
+
+        import pickle
+        path = self.file(key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            storage_write(path, lambda file: pickle.dump((timestamp, value),
+                    file), binary=True)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            pass
+
+    def store(self, key: tuple, timestamp: float, value: any):
+        ''' Stores an entry in memory, evicting the least recently used
+
+        Arguments
+        ---------
+        key: tuple
+            the entry's key
+        timestamp: float
+            when the entry was created
+        value: any
+            the result to store
+        '''
+
+        if not self.size:
+            return
+
+        with self.lock:
+            self.entries[key] = (timestamp, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def file(self, key: tuple) -> str:
+        ''' Evaluates the path of an entry on disk
+
+        Arguments
+        ---------
+        key: tuple
+            the entry's key
+
+        Returns
+        -------
+        path: str
+            the path of the entry's file
+        '''
+
+        import hashlib
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.path, digest)
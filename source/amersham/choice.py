@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import enum
+
+from .parse_exception import ParseException
+
+
+class Choice:
+
+    def __init__(self, values: list, limit: int = 8):
+        if not values:
+            raise Exception("choices empty")
+        
+        # Maps each value's label to the value itself; labels are matched
+        # case-insensitively, so they're all lowercase
+        self.values = {}
+        for value in values:
+            label = value.name if isinstance(value, enum.Enum) \
+                    else f"{value}"
+            label = label.lower()
+            if label in self.values:
+                raise Exception(f"choice '{label}' listed more than once")
+            self.values[label] = value
+
+        self.labels = list(self.values.keys())
+        self.sorted_labels = sorted(self.labels)
+        self.limit = limit
+        self.index = None
+
+    @staticmethod
+    def construct(value_type: type, overrides: dict) -> any:
+        ''' Evaluates a flag or parameter's choice type, if it has one
+
+        Arguments
+        ---------
+        value_type: type
+            the argument's type
+        overrides: dict
+            the argument's overrides, which may list 'choices'
+
+        Returns
+        -------
+        value_type: any
+            a choice of enumeration members or listed values, or the type
+            given if neither apply
+
+        Raises
+        ------
+        exception: Exception
+            if choices were given for a type other than a string or integer
+        '''
+
+        if isinstance(value_type, type) and issubclass(value_type, enum.Enum):
+            return Choice(list(value_type))
+
+        if "choices" not in overrides:
+            return value_type
+        elif value_type not in [str, int]:
+            raise Exception(f"choices of type ({value_type}) not supported")
+        return Choice(list(overrides["choices"]))
+
+    def cast(self, value: str) -> any:
+        ''' Looks up a choice by label
+
+        Arguments
+        ---------
+        value: str
+            the label, in any case
+
+        Returns
+        -------
+        value: any
+            the matching value
+
+        Raises
+        ------
+        exception: ParseException
+            if there's no such choice; suggests the closest, if any are close
+        '''
+
+        label = value.lower()
+        if label in self.values:
+            return self.values[label]
+        
+        message = f"expects one of {self.serialize()}, got '{value}'"
+        suggestion = self.suggest(label)
+        if suggestion:
+            message += f"; did you mean '{suggestion}'?"
+        raise ParseException(message)
+
+    def complete(self, prefix: str) -> list:
+        ''' Finds the choices starting with a prefix
+
+        Arguments
+        ---------
+        prefix: str
+            the start of a label, in any case
+
+        Returns
+        -------
+        labels: list
+            the matching labels, in order
+        '''
+
+        prefix = prefix.lower()
+        labels = self.sorted_labels
+        start = bisect.bisect_left(labels, prefix)
+        end = start
+        while end < len(labels) and labels[end].startswith(prefix):
+            end += 1
+        return labels[start:end]
+
+    def serialize(self) -> str:
+        ''' Lists the choices, truncated if there are many
+
+        Returns
+        -------
+        text: str
+            the choices' labels
+        '''
+
+        labels = self.labels[:self.limit]
+        if len(self.labels) > self.limit:
+            labels.append("...")
+        return f"{{{', '.join(labels)}}}"
+
+    @staticmethod
+    def grams(label: str) -> set:
+        ''' Splits a label into overlapping character trigrams
+
+        Arguments
+        ---------
+        label: str
+            the label
+
+        Returns
+        -------
+        grams: set
+            the label's trigrams, padded so short labels have some
+        '''
+
+        padded = f"^{label}$"
+        return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+    def suggest(self, value: str, candidates: int = 16) -> str:
+        ''' Finds the choice most like a mistyped value
+
+        Uses a trigram index, built on first use, to shortlist choices sharing
+        the most trigrams; those are then compared in full
+
+        Arguments
+        ---------
+        value: str
+            the mistyped value
+        candidates: int
+            how many choices to shortlist
+
+        Returns
+        -------
+        suggestion: str
+            the closest label, or an empty string if none are close
+        '''
+
+        if self.index is None:
+            index = collections.defaultdict(list)
+            for label in self.labels:
+                for gram in Choice.grams(label):
+                    index[gram].append(label)
+            self.index = dict(index)
+        
+        counts = collections.Counter()
+        for gram in Choice.grams(value):
+            counts.update(self.index.get(gram, []))
+        
+        shortlist = [label for label, _ in counts.most_common(candidates)]
+        import difflib
+        matches = difflib.get_close_matches(value, shortlist, n=1)
+        return matches[0] if matches else ""
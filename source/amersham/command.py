@@ -1,22 +1,50 @@
 from __future__ import annotations
 
-import inspect
+import collections.abc
+import functools
+import importlib
+import itertools
+import os
+import weakref
 
+from .cache import Cache
+from .context import Context
 from .flag import Flag
-from .parameter import Parameter
+from .output import formats as output_formats, write as output_write
+from .parallel import Parallel
+from .parameter import Parameter, Values
 from .parse_exception import ParseException
-from .type import cast as type_cast, serialize as type_serialize
+from .stream import Stream
+from .type import (
+    cast as type_cast, 
+    cast_column as type_cast_column,
+    coerce as type_coerce,
+    managed as type_managed, 
+    serialize as type_serialize,
+)
 from .table import serialize as table_serialize
 
 
 class Command:
 
+    # Registered commands by identifier, so parse results can be sent 
+    # between processes; commands are dropped along with their parsers
+    registry = weakref.WeakValueDictionary()
+
     def __init__(self, 
             callback: callable,
             parser_name: str,
             name: str,
             description: str = "", 
-            raise_exceptions = False):
+            raise_exceptions = False,
+            cache: Cache = None,
+            parallel: Parallel = None,
+            output: str = "",
+            pipe: str = "",
+            requires: list = [],
+            inputs: list = [],
+            outputs: list = [],
+            columnar: bool = False):
         
         name = name.replace(" ", "-")
         name = name.replace("_", "-")
@@ -29,9 +57,31 @@ class Command:
 
         self.description = description
         self.raise_exceptions = raise_exceptions
+        self.cache = cache
+        self.parallel = parallel
+        self.output = output
+        self.pipe = pipe
+        self.requires = list(requires)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.columnar = columnar
 
         self.flags = []
         self.parameters = []
+        self.resources = {}
+
+        # Flags' defaults, by argument name, as declared by the callback
+        self.defaults = {}
+
+        # Constraints between flags, as masks over bits assigned to each
+        # flag constrained
+        self.flag_bits = {}
+        self.constraints = []
+
+        self.frozen = False
+        self.flag_index = {}
+        self.alias_index = {}
+
     
     @staticmethod
     def construct(functor: callable, 
@@ -39,7 +89,19 @@ class Command:
             overrides = {},
             name = "", 
             description = "",
-            raise_exceptions = False) -> Command:
+            raise_exceptions = False,
+            cache: Cache = None,
+            parallel: Parallel = None,
+            output: str = "",
+            pipe: str = "",
+            resources: dict = {},
+            requires: list = [],
+            inputs: list = [],
+            outputs: list = [],
+            columnar: bool = False,
+            exclusive: list = [],
+            require_one: list = [],
+            depends: dict = {}) -> Command:
         
         ''' Creates a command from a functor
 
@@ -61,6 +123,38 @@ class Command:
         raise_exceptions: bool
             a flag for testing; prevents the command from printing errors and 
             quitting
+        cache: Cache
+            memoizes the command's results, if set; adds a '--no-cache' flag
+        parallel: Parallel
+            splits a list or variadic argument between workers, if set; adds
+            a '--jobs' flag
+        output: str
+            the format iterators returned by the command are streamed to 
+            stdout in, if set; adds a '--format' flag
+        pipe: str
+            the parameter which takes the previous command's result, when the
+            command's in a pipeline
+        resources: dict
+            shared resources, by name; arguments of the same name are passed
+            the process's instance, rather than being parsed
+        requires: list
+            the names of commands to run first, when run as part of a graph
+        inputs: list
+            the files the command reads, which are hashed to check if it
+            needs running again, in a graph
+        outputs: list
+            the files the command writes; if missing, it runs again
+        columnar: bool
+            if the callback takes whole columns of values, when run over a
+            table
+        exclusive: list
+            groups of flags, by argument name, of which at most one can be
+            given
+        require_one: list
+            groups of flags, by argument name, of which at least one must be
+            given
+        depends: dict
+            the flags each flag needs given alongside it, by argument name
         
         Returns
         -------
@@ -79,11 +173,32 @@ class Command:
                 parser_name, 
                 command_name,
                 description=description,
-                raise_exceptions=raise_exceptions)
+                raise_exceptions=raise_exceptions,
+                cache=cache,
+                parallel=parallel,
+                output=output,
+                pipe=pipe,
+                requires=requires,
+                inputs=inputs,
+                outputs=outputs,
+                columnar=columnar)
 
+        import inspect
         parameters = inspect.signature(functor).parameters
+        kinds = [parameter.kind for parameter in parameters.values()]
+        unpacked = inspect.Parameter.VAR_POSITIONAL in kinds
         for name, parameter in parameters.items():
 
+            # Resources are injected by keyword, so they're not parsed
+            if name in resources:
+                if (unpacked and 
+                        parameter.kind != inspect.Parameter.KEYWORD_ONLY):
+                    message = f"resource '{name}' not keyword-only, but " \
+                            "callback takes '*' variadics"
+                    raise Exception(message)
+                command.resources[name] = resources[name]
+                continue
+
             parameter_overrides = {}
             if name in overrides:
                 parameter_overrides = overrides[name]
@@ -91,10 +206,65 @@ class Command:
             if parameter.default != inspect.Parameter.empty:
                 flag = Flag.construct(parameter, parameter_overrides)
                 command.add_flag(flag)
+                command.defaults[name] = parameter.default
             else:
                 parameter = Parameter.construct(parameter, parameter_overrides)
                 command.add_parameter(parameter)
 
+        # Named so it can't collide with the callback's own arguments
+        if cache:
+            flag = Flag("no-cache", 
+                    "--no-cache", 
+                    "", 
+                    type(None), 
+                    "bypasses the result cache")
+            command.add_flag(flag)
+
+        if parallel:
+            split = None
+            for argument in command.flags + command.parameters:
+                if argument.canonical_name == parallel.parameter:
+                    split = argument
+
+            if (not split or 
+                    (split.type != list and 
+                    not getattr(split, "variadic", False))):
+                message = f"'{parallel.parameter}' can't be split; " \
+                        "expected a list or variadic argument"
+                raise Exception(message)
+
+            flag = Flag("jobs", 
+                    "--jobs", 
+                    "", 
+                    int, 
+                    f"splits '{split.name}' between N workers")
+            command.add_flag(flag)
+
+        if pipe:
+            names = [parameter.canonical_name 
+                    for parameter in command.parameters]
+            if pipe not in names:
+                raise Exception(f"pipe '{pipe}' not a parameter")
+
+        if output:
+            if output not in output_formats:
+                raise Exception(f"output format '{output}' unsupported")
+            
+            formats = ", ".join(output_formats)
+            flag = Flag("format", 
+                    "--format", 
+                    "", 
+                    str, 
+                    f"output format; one of {formats}")
+            command.add_flag(flag)
+
+        for group in exclusive:
+            command.add_constraint("exclusive", group)
+        for group in require_one:
+            command.add_constraint("require-one", group)
+        for name, required in depends.items():
+            command.add_constraint("depends", [name], required)
+
         return command
     
     def add_flag(self, new_flag: Flag):
@@ -108,9 +278,13 @@ class Command:
         Raises
         ------
         exception: Exception
-            if the flag's name or alias are already present in the command
+            if the flag's name or alias are already present in the command, or
+            the command's frozen
         '''
 
+        if self.frozen:
+            raise Exception(f"'{self.name}' frozen")
+
         for flag in self.flags:
 
             identifier = ""
@@ -118,6 +292,8 @@ class Command:
                 identifier = f"-{flag.alias}"
             elif flag.name == new_flag.name:
                 identifier = f"--{flag.name}"
+            else:
+                continue
             
             message = f"'{identifier}' already registered in '{self.name}'"
             raise Exception(message)
@@ -134,9 +310,18 @@ class Command:
         Raises
         ------
         exception: Exception
-            if the command's name is already registered
+            if the command's name is already registered, the command's frozen,
+            or a variadic parameter's already been added
         '''
 
+        if self.frozen:
+            raise Exception(f"'{self.name}' frozen")
+        
+        if self.parameters and self.parameters[-1].variadic:
+            variadic = self.parameters[-1].name
+            message = f"'{new_parameter.name}' follows variadic '{variadic}'"
+            raise Exception(message)
+
         for parameter in self.parameters:
             if parameter.name != new_parameter.name:
                 continue
@@ -145,6 +330,158 @@ class Command:
         
         self.parameters.append(new_parameter)
     
+    def add_constraint(self, kind: str, names: list, required: list = []):
+        ''' Adds a constraint on which flags can be given together
+
+        Constraints are compiled to bitmasks, so checking one takes constant
+        time, however many flags there are
+
+        Arguments
+        ---------
+        kind: str
+            'exclusive', if at most one of the flags can be given; 
+            'require-one', if at least one must be; or 'depends', if the 
+            required flags must all be given alongside any of them
+        names: list
+            the flags constrained, by argument name
+        required: list
+            the flags needed, by argument name, for 'depends' constraints
+        
+        Raises
+        ------
+        exception: Exception
+            if the kind's unknown, a flag's unregistered or internal, a group
+            is too small, or the command's frozen
+        '''
+
+        if self.frozen:
+            raise Exception(f"'{self.name}' frozen")
+        if kind not in ["exclusive", "require-one", "depends"]:
+            raise Exception(f"constraint '{kind}' unknown")
+        if kind == "exclusive" and len(set(names)) < 2:
+            raise Exception("exclusive group needs at least two flags")
+        if not names or (kind == "depends" and not required):
+            raise Exception(f"'{kind}' constraint empty")
+
+        def mask(names: list) -> int:
+            result = 0
+            for name in names:
+                flag = None
+                for candidate in self.flags:
+                    if candidate.canonical_name == name:
+                        flag = candidate
+                if not flag or name.startswith("--"):
+                    raise Exception(f"constrained flag '{name}' not "
+                            f"registered in '{self.name}'")
+                
+                if name not in self.flag_bits:
+                    self.flag_bits[name] = (1 << len(self.flag_bits), flag)
+                result |= self.flag_bits[name][0]
+            return result
+
+        self.constraints.append((kind, mask(names), mask(required)))
+
+    def describe_flags(self, mask: int) -> str:
+        ''' Lists the flags in a mask, in the order they were constrained
+
+        Arguments
+        ---------
+        mask: int
+            the flags' bits
+
+        Returns
+        -------
+        names: str
+            the flags' quoted names
+        '''
+
+        return ", ".join(f"'--{flag.name}'" 
+                for bit, flag in self.flag_bits.values() if mask & bit)
+
+    def check_constraints(self, present: int) -> list:
+        ''' Finds the constraints broken by a set of flags
+
+        Arguments
+        ---------
+        present: int
+            the bits of the constrained flags given
+
+        Returns
+        -------
+        messages: list
+            a message for each broken constraint, in the order they were 
+            added
+        '''
+
+        messages = []
+        for kind, mask, required in self.constraints:
+            given = present & mask
+
+            # More than one bit set
+            if kind == "exclusive" and given & (given - 1):
+                flags = self.describe_flags(given)
+                messages.append(f"{flags} mutually exclusive")
+
+            elif kind == "require-one" and not given:
+                flags = self.describe_flags(mask)
+                messages.append(f"expected one of {flags}")
+
+            elif (kind == "depends" and given and 
+                    present & required != required):
+                flags = self.describe_flags(required & ~present)
+                messages.append(f"{self.describe_flags(given)} requires "
+                        f"{flags}")
+        
+        return messages
+
+    @property
+    def identifier(self) -> str:
+        ''' The callback's module, and the parser and command's names '''
+
+        module = self.callback.__module__
+        return f"{module}:{self.parser_name}:{self.name}"
+
+    def register(self):
+        ''' Lets the command be found by its identifier
+
+        If another command has the same identifier, as when an app's parser
+        is built more than once, the latest registered is found
+        '''
+
+        Command.registry[self.identifier] = self
+
+    @staticmethod
+    def lookup(identifier: str) -> Command:
+        ''' Finds a command by identifier, importing its module if needed
+        
+        Arguments
+        ---------
+        identifier: str
+            the command's identifier; its callback's module, and its parser 
+            and own names
+        
+        Returns
+        -------
+        command: Command
+            the command
+        
+        Raises
+        ------
+        exception: Exception
+            if no such command is registered, even after importing
+        '''
+
+        if identifier not in Command.registry:
+            module = identifier.split(":")[0]
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+
+        if identifier not in Command.registry:
+            raise Exception(f"command '{identifier}' not registered")
+        return Command.registry[identifier]
+
     def get_flag(self, name: str, alias: bool) -> Flag:
         ''' Fetches a flag of a given name, alias or long-form
         
@@ -162,19 +499,41 @@ class Command:
             couldn't be found
         '''
 
+        if self.frozen:
+            index = self.alias_index if alias else self.flag_index
+            return index.get(name)
+
         for flag in self.flags:
             if ((alias and name == flag.alias) or 
                     (not alias and name == flag.name)):
                 return flag
         return None
 
-    def fail(self, message: str):
+    def freeze(self):
+        ''' Prevents further changes to the command
+
+        Lets one command be run from many threads at once, and indexes flags
+        for constant-time lookup
+        '''
+
+        self.flags = tuple(self.flags)
+        self.parameters = tuple(self.parameters)
+
+        self.flag_index = {flag.name: flag for flag in self.flags}
+        self.alias_index = {flag.alias: flag for flag in self.flags 
+                if flag.alias}
+        self.frozen = True
+
+    def fail(self, message: str, context: Context = None):
         ''' Fails when an input exception occurs
         
         Arguments
         ---------
         message: str
             the message to print
+        context: Context
+            the invocation's context; defaults to one using the command's
+            raise exceptions flag
         
         Raises
         ------
@@ -183,12 +542,9 @@ class Command:
             where the user wants to handle exceptions themselves
         '''
 
-        if self.raise_exceptions:
-            raise ParseException(message)
-        else:
-            print(self.usage())
-            print(message)
-            exit(1)
+        if context is None:
+            context = Context(self.raise_exceptions)
+        context.fail(self.usage(), message)
 
     def help(self, root: bool = False) -> str:
         ''' Serializes an informative help message
@@ -212,23 +568,48 @@ class Command:
         # Enumerate flags
         flag_table = [["--help", "-h", "", "displays this message"]]
         for flag in self.flags:
+            # Computed defaults aren't evaluated just for help
+            description = flag.description
+            if flag.default_factory:
+                factory = getattr(flag.default_factory, "__name__", "")
+                placeholder = f"<{factory}>" if factory.isidentifier() \
+                        else "<computed>"
+                description = f"{description} (default {placeholder})" \
+                        .lstrip()
+
             row = [
                 f"--{flag.name}", 
                 f"-{flag.alias}" if flag.alias else "", 
-                type_serialize(flag.type),
-                flag.description,
+                "count" if flag.count else type_serialize(flag.type),
+                description,
             ]
             flag_table.append(row)
         table = table_serialize(flag_table, "  ", "\n  ")
         result += f"\n\nflags\n  {table}"
 
+        # Enumerate constraints
+        if self.constraints:
+            lines = []
+            for kind, mask, required in self.constraints:
+                flags = self.describe_flags(mask)
+                if kind == "exclusive":
+                    lines.append(f"{flags} mutually exclusive")
+                elif kind == "require-one":
+                    lines.append(f"one of {flags} required")
+                else:
+                    lines.append(f"{flags} requires "
+                            f"{self.describe_flags(required)}")
+            constraints = "\n  ".join(lines)
+            result += f"\n\nconstraints\n  {constraints}"
+
         # Enumerate parameters
         if self.parameters:
             parameter_table = []
 
             for parameter in self.parameters:
+                suffix = "..." if parameter.variadic else ""
                 row = [
-                    parameter.name.upper(),
+                    f"{parameter.name.upper()}{suffix}",
                     type_serialize(parameter.type),
                     parameter.description,
                 ]
@@ -257,16 +638,25 @@ class Command:
 
         # Append flags
         for flag in self.flags:
-            hint = "=" if flag.type != type(None) else ""
-            result += f" [--{flag.name}{hint}]"
+            hint = "=" if flag.expects_value else ""
+            repeats = "..." if flag.repeatable or flag.count else ""
+            result += f" [--{flag.name}{hint}]{repeats}"
         
         # Append parameters
         for parameter in self.parameters:
-            result += f" {parameter.name.upper()}"
+            if not parameter.variadic:
+                result += f" {parameter.name.upper()}"
+            elif parameter.minimum:
+                result += f" {parameter.name.upper()}..."
+            else:
+                result += f" [{parameter.name.upper()}...]"
         
         return result
 
-    def run(self, arguments: list, root: bool = False) -> any:
+    def run(self, 
+            arguments: list, 
+            root: bool = False, 
+            context: Context = None) -> any:
         ''' Runs the command
 
         Takes user CLI input and formats its flags and parameters into
@@ -279,6 +669,9 @@ class Command:
             present
         root: bool
             if this is the only command registed with the parser
+        context: Context
+            per-call error handling, output and tracing; defaults to one using
+            the command's raise exceptions flag
         
         Returns
         -------
@@ -293,23 +686,767 @@ class Command:
             if the parser was set-up incorrectly
         '''
 
+        if context is None:
+            context = Context(self.raise_exceptions)
+        trace = context.trace
+
         # Check for help
-        if arguments and (arguments[0] == "--help" or arguments[0] == "-h"):
+        first = os.fsdecode(arguments[0]) if arguments else ""
+        if first == "--help" or first == "-h":
             if len(arguments) != 1:
-                self.fail(f"'{arguments[0]}' followed by other arguments")
-            print(self.help(root=root))
+                message = f"'{first}' followed by other arguments"
+                self.fail(message, context)
+            context.print(self.help(root=root))
             return
 
+        # Handles opened while casting; closed once the callback returns
+        handles = []
+        try:
+            pack = self.parse(arguments, handles, context)
+            return self.execute(pack, context)
+        finally:
+            for handle in handles:
+                handle.close()
+
+    def run_json(self, 
+            flags: dict, 
+            parameters: list, 
+            context: Context = None) -> any:
+        ''' Runs the command with already-typed arguments, as from JSON
+
+        Values are checked against the flags' and parameters' types, rather
+        than parsed; strings are cast as they would be from the command line
+        
+        Arguments
+        ---------
+        flags: dict
+            flag values, by name (without dashes); null leaves a flag unset
+        parameters: list
+            parameter values, in order
+        context: Context
+            per-call error handling, output and tracing; defaults to one using
+            the command's raise exceptions flag
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if a value was of the wrong type, or missing; messages match
+            those for command-line arguments
+        '''
+
+        if context is None:
+            context = Context(self.raise_exceptions)
+
+        handles = []
+        try:
+            pack = self.parse_json(flags, parameters, handles, context)
+            return self.execute(pack, context)
+        finally:
+            for handle in handles:
+                handle.close()
+
+    def execute(self, pack: dict, context: Context) -> any:
+        ''' Invokes the callback with parsed arguments, and streams its output
+
+        Arguments
+        ---------
+        pack: dict
+            the cast arguments, as returned by the parse method
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns, or None if streamed
+        '''
+
+        trace = context.trace
+        output_format = pack.pop("--format", self.output)
+
+        if trace:
+            trace.begin_callback()
+        try:
+            result = self.invoke(pack, context)
+            return self.stream(result, output_format, context)
+        finally:
+            if trace:
+                trace.end_callback()
+
+    def stream(self, result: any, output_format: str, context: Context) -> any:
+        ''' Streams a callback's result to the output, if it's an iterator
+        
+        Arguments
+        ---------
+        result: any
+            the callback's result
+        output_format: str
+            the format to stream in; if empty, nothing's streamed
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        result: any
+            the result, or None if it was streamed
+        '''
+
+        if output_format and isinstance(result, collections.abc.Iterator):
+            output_write(result, output_format, context.output)
+            return None
+        return result
+
+    def invoke(self, pack: dict, context: Context = None) -> any:
+        ''' Calls the callback with parsed arguments
+
+        Goes via the cache and worker pool, if set
+        
+        Arguments
+        ---------
+        pack: dict
+            the cast arguments, as returned by the parse method
+        context: Context
+            the invocation's context; defaults to one using the command's
+            raise exceptions flag
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns
+        '''
+
+        if context is None:
+            context = Context(self.raise_exceptions)
+
+        pack = dict(self.materialize(pack, context))
+        pack.pop("--format", None)
+        bypass = pack.pop("--no-cache", False)
+        jobs = pack.pop("--jobs", 1)
+
+        call = self.call
+        if self.parallel:
+
+            # Absent list flags are split too, so results reduce the same way
+            name = self.parallel.parameter
+            if name not in pack and name in self.defaults:
+                pack[name] = list(self.defaults[name])
+            call = functools.partial(self.parallel.run, 
+                    self.identifier, 
+                    self.call, 
+                    jobs=jobs)
+
+        if not self.cache:
+            return call(pack)
+
+        key = None
+        if not bypass:
+            key = self.cache.key(self.identifier, pack)
+        if key is None:
+            return call(pack)
+
+        # Iterators can only be consumed once, so aren't kept
+        hit, result = self.cache.get(key)
+        if not hit:
+            result = call(pack)
+            if not isinstance(result, collections.abc.Iterator):
+                self.cache.put(key, result)
+        return result
+
+    def call(self, pack: dict) -> any:
+        ''' Calls the callback, unpacking any '*args' parameter
+        
+        Arguments
+        ---------
+        pack: dict
+            the cast arguments, keyed by the callback's argument names
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns
+        '''
+
+        # Resources are taken from their pools for the length of the call
+        acquired = []
+        try:
+            if self.resources:
+                pack = dict(pack)
+                for name, resource in self.resources.items():
+                    pack[name] = resource.acquire()
+                    acquired.append((resource, pack[name]))
+
+            if not self.parameters or not self.parameters[-1].unpack:
+                return self.callback(**pack)
+
+            # Parameters preceding '*args' have to be passed by position
+            pack = dict(pack)
+            values = [pack.pop(parameter.canonical_name) 
+                    for parameter in self.parameters]
+            return self.callback(*values[:-1], *values[-1], **pack)
+        finally:
+            for resource, value in acquired:
+                resource.release(value)
+
+    def run_columns(self,
+            table: any,
+            chunk_size: int = 1 << 12,
+            context: Context = None) -> list:
+        ''' Runs the command over a table of arguments
+
+        Each column is cast at once; then the callback's called per row, or
+        per chunk of rows with whole columns if the command's columnar. Empty
+        cells leave flags unset, and presence flags take booleans
+        
+        Arguments
+        ---------
+        table: any
+            a mapping of flag and parameter names to columns of values, or
+            the path of a CSV file with a header of names, read in chunks
+        chunk_size: int
+            how many CSV rows to read at a time
+        context: Context
+            per-call error handling; defaults to one using the command's 
+            raise exceptions flag
+        
+        Returns
+        -------
+        results: list
+            what the callback returned for each row, or for each chunk if
+            it's columnar
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the columns didn't match the command's arguments, or any cells
+            couldn't be cast; every invalid cell's reported, by row
+        '''
+
+        if context is None:
+            context = Context(self.raise_exceptions)
+        
+        if isinstance(table, dict):
+            return self.run_chunk(table, 0, context)
+
+        import csv
+        results = []
+        with open(table, newline="") as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            offset = 0
+            for rows in iter(lambda: list(itertools.islice(reader, 
+                    chunk_size)), []):
+                columns = {name: [row[index] if index < len(row) else ""
+                        for row in rows] 
+                        for index, name in enumerate(header)}
+                results += self.run_chunk(columns, offset, context)
+                offset += len(rows)
+        return results
+
+    def run_chunk(self, columns: dict, offset: int, context: Context) -> list:
+        ''' Casts a chunk of a table's columns, then runs the command on it
+        
+        Arguments
+        ---------
+        columns: dict
+            the columns of values, by flag or parameter name
+        offset: int
+            the number of rows in previous chunks, for numbering errors
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        results: list
+            what the callback returned for each row, or for the chunk if
+            it's columnar
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the columns didn't match the command's arguments, or any cells
+            couldn't be cast
+        '''
+
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            self.fail("columns differ in length", context)
+        length = lengths.pop() if lengths else 0
+
+        # Match columns to arguments; internal flags can't be set
+        arguments = {}
+        for name in columns:
+            flag = self.get_flag(name, False)
+            parameter = None
+            for candidate in self.parameters:
+                if candidate.name == name:
+                    parameter = candidate
+            argument = flag or parameter
+            if not argument or argument.canonical_name.startswith("--"):
+                self.fail(f"unexpected column '{name}'", context)
+            if parameter and parameter.variadic:
+                self.fail(f"variadic '{name}' can't be a column", context)
+            arguments[name] = argument
+        
+        for parameter in self.parameters:
+            if parameter.name not in columns:
+                self.fail(f"expected column '{parameter.name}'", context)
+
+        # Cast each column at once; empty (or None) cells are unset flags
+        pack = {}
+        errors = []
+        masks = [0] * length if self.constraints else None
+        for name, argument in arguments.items():
+            values = columns[name]
+            value_type = argument.type
+            if isinstance(argument, Flag):
+                if argument.type == type(None):
+                    value_type = bool
+                elif argument.count:
+                    value_type = int
+            
+            present = [index for index, value in enumerate(values) 
+                    if (value != "" and value is not None) or 
+                    isinstance(argument, Parameter)]
+            cast_values, cast_errors = type_cast_column(value_type, 
+                    [values[index] for index in present])
+            for index, error in cast_errors.items():
+                row = offset + present[index] + 1
+                identifier = f"--{name}" if isinstance(argument, Flag) \
+                        else name
+                errors.append((row, f"row {row}: '{identifier}' {error}"))
+            
+            # Unset flags take their defaults; switches are off, as they'd
+            # be from the command line
+            default = self.defaults.get(argument.canonical_name)
+            if isinstance(argument, Flag) and argument.type == type(None):
+                default = False
+            elif type_managed(argument.type):
+                default = None
+            bit = 0
+            if argument.canonical_name in self.flag_bits:
+                bit = self.flag_bits[argument.canonical_name][0]
+            column = [default] * length
+            if (getattr(argument, "default_factory", None) and 
+                    len(present) < length):
+                column = [argument.default() for _ in range(length)]
+            for index, value in zip(present, cast_values):
+                if value is False and argument.type == type(None):
+                    pass
+                elif bit:
+                    masks[index] |= bit
+                column[index] = value
+            pack[argument.canonical_name] = column
+        
+        # Absent flags' columns are filled as check_flags would: computed
+        # defaults, switches off, and no files
+        for flag in self.flags:
+            if (flag.canonical_name in pack or 
+                    flag.canonical_name.startswith("--")):
+                continue
+            if flag.default_factory:
+                pack[flag.canonical_name] = [flag.default() 
+                        for _ in range(length)]
+            elif not flag.expects_value and not flag.count:
+                pack[flag.canonical_name] = [False] * length
+            elif type_managed(flag.type):
+                pack[flag.canonical_name] = [None] * length
+
+        if masks is not None:
+            for index, mask in enumerate(masks):
+                row = offset + index + 1
+                for message in self.check_constraints(mask):
+                    errors.append((row, f"row {row}: {message}"))
+        
+        if errors:
+            errors.sort(key=lambda error: error[0])
+            self.fail("\n".join(message for _, message in errors), context)
+
+        if self.columnar:
+            return [self.invoke(pack)]
+
+        results = []
+        for index in range(length):
+            row = {name: column[index] for name, column in pack.items()}
+            results.append(self.invoke(row))
+        return results
+
+    def consume(self, 
+            parameter: Parameter, 
+            arguments: list, 
+            start: int, 
+            terminated: bool,
+            context: Context) -> tuple:
+        ''' Takes a variadic parameter's values, up to the next flag
+
+        Values are cast as they're taken, so errors are reported while
+        parsing; files and streams are only opened once the callback iterates
+        over them, so their paths are kept as given
+        
+        Arguments
+        ---------
+        parameter: Parameter
+            the variadic parameter
+        arguments: list
+            all the command's arguments
+        start: int
+            the index of the first value
+        terminated: bool
+            if a lone '--' has already been given, so nothing's a flag
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        values, end: tuple[Values, int]
+            the values, and the index of the flag which ended them (or the 
+            number of arguments, if none did)
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if there were too few or too many values, or one couldn't be cast
+        '''
+
+        # Find the end, and any '--' amongst the values
+        terminator = None
+        end = start
+        while end < len(arguments):
+            argument = arguments[end]
+            dash = b"-" if isinstance(argument, bytes) else "-"
+            if not terminated:
+                if argument == dash * 2:
+                    terminated = True
+                    terminator = end
+                    end += 1
+                    continue
+                is_stdin = argument == dash and \
+                        isinstance(parameter.type, Stream)
+                if not is_stdin and argument[:1] == dash:
+                    break
+            end += 1
+
+        values = itertools.islice(arguments, start, end)
+        if terminator is not None:
+            values = itertools.chain(
+                    itertools.islice(arguments, start, terminator),
+                    itertools.islice(arguments, terminator + 1, end))
+        count = end - start - (terminator is not None)
+        self.check_count(parameter, count, context)
+
+        if parameter.type == str or type_managed(parameter.type):
+            return (Values(values), end)
+        return (Values(self.cast_values(parameter, values, context)), end)
+
+    def cast_values(self, 
+            parameter: Parameter, 
+            values: iter, 
+            context: Context) -> iter:
+        ''' Casts a variadic parameter's values, one at a time
+
+        Arguments
+        ---------
+        parameter: Parameter
+            the variadic parameter
+        values: iter
+            the values, as given
+        context: Context
+            the invocation's context
+
+        Returns
+        -------
+        values: iter
+            an iterator over the cast values
+        
+        Raises
+        ------
+        parse_error: ParseException
+            (while iterating) if a value couldn't be cast
+        '''
+
+        for value in values:
+            try:
+                yield type_cast(parameter.type, value)
+            except ParseException as error:
+                self.fail(f"'{parameter.name}' {error}", context)
+
+    def materialize(self, pack: dict, context: Context) -> dict:
+        ''' Swaps a variadic parameter's values for an iterator over them
+
+        Files and streams are opened as they're iterated over
+
+        Arguments
+        ---------
+        pack: dict
+            the cast arguments, as returned by the parse method
+        context: Context
+            the invocation's context, for failing on files that can't be 
+            opened
+        
+        Returns
+        -------
+        pack: dict
+            a copy of the arguments, if there were values to swap
+        
+        Raises
+        ------
+        parse_error: ParseException
+            (while iterating) if a file couldn't be opened
+        '''
+
+        if not self.parameters or not self.parameters[-1].variadic:
+            return pack
+        parameter = self.parameters[-1]
+        values = pack.get(parameter.canonical_name)
+        if not isinstance(values, Values):
+            return pack
+
+        pack = dict(pack)
+        if not type_managed(parameter.type):
+            pack[parameter.canonical_name] = iter(values)
+            return pack
+
+        pack[parameter.canonical_name] = self.cast_values(parameter, 
+                values, 
+                context)
+        return pack
+
+    def check_count(self, parameter: Parameter, count: int, context: Context):
+        ''' Checks a variadic parameter's been given enough values
+
+        Arguments
+        ---------
+        parameter: Parameter
+            the variadic parameter
+        count: int
+            how many values it was given
+        context: Context
+            the invocation's context
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if there were too few or too many values
+        '''
+
+        if count < parameter.minimum:
+            message = f"'{parameter.name}' expects at least " \
+                    f"{parameter.minimum} values, got {count}"
+            self.fail(message, context)
+        if parameter.maximum is not None and count > parameter.maximum:
+            message = f"'{parameter.name}' expects at most " \
+                    f"{parameter.maximum} values, got {count}"
+            self.fail(message, context)
+
+    def parse_json(self,
+            flags: dict,
+            parameters: list,
+            handles: list,
+            context: Context) -> dict:
+        ''' Checks already-typed arguments into the callback's arguments
+        
+        Arguments
+        ---------
+        flags: dict
+            flag values, by name (without dashes)
+        parameters: list
+            parameter values, in order
+        handles: list
+            collects any streams or files opened, for the caller to close
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        pack: dict
+            the arguments, keyed by the callback's argument names
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if a value was of the wrong type, or missing
+        '''
+
+        pack = {}
+        for name, value in flags.items():
+            flag = self.get_flag(name, False)
+            if not flag:
+                self.fail(f"'--{name}' flag unexpected", context)
+            if value is None:
+                continue
+            
+            try:
+                cast_value = type_coerce(int if flag.count else flag.type, 
+                        value)
+            except ParseException as error:
+                self.fail(f"'--{name}' {error}", context)
+            if type_managed(flag.type) and hasattr(cast_value, "close"):
+                handles.append(cast_value)
+            pack[flag.canonical_name] = cast_value
+        
+        for index, parameter in enumerate(self.parameters):
+
+            # Variadic parameters take everything that's left
+            if parameter.variadic:
+                values = parameters[index:]
+                self.check_count(parameter, len(values), context)
+                cast_values = []
+                for value in values:
+                    try:
+                        cast_values.append(type_coerce(parameter.type, value))
+                    except ParseException as error:
+                        self.fail(f"'{parameter.name}' {error}", context)
+                pack[parameter.canonical_name] = iter(cast_values)
+                break
+
+            if index == len(parameters):
+                missing = ", ".join(f"'{parameter.name}'" 
+                        for parameter in self.parameters[index:])
+                self.fail(f"expected {missing}", context)
+            
+            try:
+                cast_value = type_coerce(parameter.type, parameters[index])
+            except ParseException as error:
+                self.fail(f"'{parameter.name}' {error}", context)
+            if type_managed(parameter.type) and hasattr(cast_value, "close"):
+                handles.append(cast_value)
+            pack[parameter.canonical_name] = cast_value
+        
+        else:
+            if len(parameters) > len(self.parameters):
+                extra = parameters[len(self.parameters)]
+                self.fail(f"unexpected parameter '{extra}'", context)
+        
+        self.check_flags(pack, context)
+        return pack
+
+    def check_flags(self, pack: dict, context: Context):
+        ''' Fills in absent flags' defaults, and checks internal flags
+
+        Arguments
+        ---------
+        pack: dict
+            the cast arguments, updated in place
+        context: Context
+            the invocation's context
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if an output format or worker count was invalid, or constraints
+            between flags were broken
+        '''
+
+        # Check constraints, reporting every one broken; switches set false
+        # count as absent
+        if self.constraints:
+            present = 0
+            for name, (bit, flag) in self.flag_bits.items():
+                if name not in pack:
+                    continue
+                if pack[name] is False and flag.type == type(None):
+                    continue
+                present |= bit
+            
+            messages = self.check_constraints(present)
+            if messages:
+                self.fail("\n".join(messages), context)
+
+        # Provide default values for "boolean" flags, absent files, and
+        # those computed by factories
+        for flag in self.flags:
+            if flag.canonical_name in pack:
+                continue
+            elif flag.default_factory:
+                pack[flag.canonical_name] = flag.default()
+            elif not flag.expects_value and not flag.count:
+                pack[flag.canonical_name] = False
+            elif type_managed(flag.type):
+                pack[flag.canonical_name] = None
+
+        # Check output format valid
+        if "--format" in pack and pack["--format"] not in output_formats:
+            formats = ", ".join(output_formats)
+            message = f"'--format' expects one of {formats}, " \
+                    f"got '{pack['--format']}'"
+            self.fail(message, context)
+
+        # Check worker count valid
+        if "--jobs" in pack and pack["--jobs"] < 1:
+            jobs = pack["--jobs"]
+            message = f"'--jobs' expects a positive integer, got {jobs}"
+            self.fail(message, context)
+
+    def parse(self, 
+            arguments: list, 
+            handles: list, 
+            context: Context,
+            piped: bool = False) -> dict:
+        ''' Parses arguments into the callback's keyword arguments
+        
+        Arguments
+        ---------
+        arguments: list
+            the arguments (stripped of path directory and command name if 
+            present
+        handles: list
+            collects any streams or files opened while casting, for the caller
+            to close
+        context: Context
+            the invocation's context
+        piped: bool
+            if the command's in a pipeline, taking its pipe parameter from
+            the previous stage rather than the arguments
+        
+        Returns
+        -------
+        pack: dict
+            the cast arguments, keyed by the callback's argument names
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the user's input was wrong, somehow
+        '''
+
+        trace = context.trace
+
+        parameters = self.parameters
+        if piped:
+            parameters = [parameter for parameter in parameters 
+                    if parameter.canonical_name != self.pipe]
+
         parameter_index = 0
-        parameter_count = len(self.parameters)
-        defined_flags = []
+        parameter_count = len(parameters)
+        occurrences = {}
+
+        # After a lone '--', everything's a parameter
+        terminated = False
+        resume = 0
 
         pack = {}
-        for argument in arguments:
+        for index, argument in enumerate(arguments):
 
-            length = len(argument)
-            if ((length >= 2 and argument[:2] == "--") or
-                    (length >= 1 and argument[0] == "-")):
+            # Skip values already taken by a variadic parameter
+            if index < resume:
+                continue
+
+            # Arguments may be bytes, which are only decoded where needed
+            dash = b"-" if isinstance(argument, bytes) else "-"
+            if not terminated and argument == dash * 2:
+                terminated = True
+                continue
+
+            # A lone '-' means stdin, where a stream parameter is expected
+            is_stdin = (argument == dash and 
+                    parameter_index < parameter_count and
+                    isinstance(parameters[parameter_index].type, Stream))
+
+            if not terminated and not is_stdin and argument[:1] == dash:
                 
                 # Unpack flag
                 name = ""
@@ -318,66 +1455,128 @@ class Command:
                 try:
                     name, is_alias, value = Flag.parse(argument)
                 except ParseException as error:
-                    self.fail(f"{error}")
+                    self.fail(f"{error}", context)
                 
-                # Try to find match
+                # Try to find match; '-vvv' repeats a counted '-v'
                 flag = self.get_flag(name, is_alias)
                 identifier = f"-{name}" if is_alias else f"--{name}"
+                repeats = 1
+                if not flag and is_alias and len(set(name)) == 1:
+                    flag = self.get_flag(name[0], True)
+                    if flag and flag.count:
+                        repeats = len(name)
+                    else:
+                        flag = None
                 if not flag:
-                    self.fail(f"'{identifier}' flag unexpected")
+                    self.fail(f"'{identifier}' flag unexpected", context)
+                if trace:
+                    trace.mark("lookup")
+                    trace.flag(flag.name, value)
                 
                 # Check a value was asked for
-                if value is not None and flag.type == type(None):
-                    self.fail(f"'--{flag.name}' expects no value")
+                equals = b"=" if isinstance(argument, bytes) else "="
+                if (value is not None and equals in value and 
+                        flag.type != dict):
+                    message = f"'{identifier}' has multiple '=' instances"
+                    self.fail(message, context)
+                if value is not None and not flag.expects_value:
+                    self.fail(f"'--{flag.name}' expects no value", context)
                 
-                # Check flag not already defined
-                if flag.canonical_name in defined_flags:
-                    self.fail(f"'--{flag.name}' defined more than once")
-                defined_flags.append(flag.canonical_name)
+                # Check flag not already defined, unless it can be repeated
+                occurrence = occurrences.get(flag.canonical_name, 0)
+                if occurrence and not (flag.repeatable or flag.count):
+                    message = f"'--{flag.name}' defined more than once"
+                    self.fail(message, context)
+                occurrences[flag.canonical_name] = occurrence + repeats
                 
                 # Check flag not defined after parameters
                 if parameter_index != 0:
-                    self.fail(f"'--{flag.name}' follows a parameter")
+                    self.fail(f"'--{flag.name}' follows a parameter", context)
                 
+                # Counted flags take no value
+                if flag.count:
+                    pack[flag.canonical_name] = occurrence + repeats
+                    continue
+
                 # Cast value to flag type
                 cast_value = None
                 try:
                     cast_value = type_cast(flag.type, value)
                 except ParseException as error:
-                    self.fail(f"'--{name}' {error}")
+                    self.fail(f"'--{name}' {error}", context)
+                if trace:
+                    trace.mark("cast")
+                if type_managed(flag.type) and hasattr(cast_value, "close"):
+                    handles.append(cast_value)
                 
-                pack[flag.canonical_name] = cast_value
+                # Accumulate repeated values
+                if not occurrence:
+                    pack[flag.canonical_name] = cast_value
+                elif flag.type == list:
+                    pack[flag.canonical_name].extend(cast_value)
+                else:
+                    pack[flag.canonical_name].update(cast_value)
             
             else:
 
                 # Find parameter
                 if parameter_index == parameter_count:
-                    self.fail(f"unexpected parameter '{argument}'")
-                parameter = self.parameters[parameter_index]
+                    message = f"unexpected parameter '{os.fsdecode(argument)}'"
+                    self.fail(message, context)
+                parameter = parameters[parameter_index]
+                if trace:
+                    trace.mark("lookup")
                 
+                # Variadic parameters take everything up to the next flag,
+                # which is then rejected as following a parameter
+                if parameter.variadic:
+                    values, resume = self.consume(parameter, 
+                            arguments, 
+                            index, 
+                            terminated,
+                            context)
+                    pack[parameter.canonical_name] = values
+                    parameter_index += 1
+                    continue
+
                 # Cast value to flag type
                 cast_value = None
                 try:
                     cast_value = type_cast(parameter.type, argument)
                 except ParseException as error:
-                    self.fail(f"'{parameter.name}' {error}")
+                    self.fail(f"'{parameter.name}' {error}", context)
+                if trace:
+                    trace.mark("cast")
+                if (type_managed(parameter.type) and 
+                        hasattr(cast_value, "close")):
+                    handles.append(cast_value)
 
                 pack[parameter.canonical_name] = cast_value
                 parameter_index += 1
         
-        # Provide default values for "boolean" flags
-        for flag in self.flags:
-            if flag.canonical_name not in pack and flag.type == type(None):
-                pack[flag.canonical_name] = False
+        self.check_flags(pack, context)
+
+        # Variadic parameters may have no values
+        if (parameter_index == parameter_count - 1 and 
+                parameters[parameter_index].variadic):
+            parameter = parameters[parameter_index]
+            end = len(arguments)
+            values, _ = self.consume(parameter, 
+                    arguments, 
+                    end, 
+                    terminated, 
+                    context)
+            pack[parameter.canonical_name] = values
+            parameter_index += 1
 
         # Check all the parameters we expected are present
         if parameter_index != parameter_count:
             missing_parameters = []
             for index in range(parameter_index, parameter_count):
-                hint = f"'{self.parameters[index].name}'"
+                hint = f"'{parameters[index].name}'"
                 missing_parameters.append(hint)
             
             parameter_names = ", ".join(missing_parameters)
-            self.fail(f"expected {parameter_names}")
+            self.fail(f"expected {parameter_names}", context)
             
-        return self.callback(**pack)
\ No newline at end of file
+        return pack
\ No newline at end of file
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import sys
+
+from .parse_exception import ParseException
+from .trace import Trace
+
+
+class Context:
+
+    def __init__(self,
+            raise_exceptions: bool = False,
+            output: any = None,
+            trace: Trace = None):
+
+        self.raise_exceptions = raise_exceptions
+        self.output = output
+        self.trace = trace
+
+    def print(self, text: str):
+        ''' Writes a line of output to the call's sink
+
+        Arguments
+        ---------
+        text: str
+            the text to write
+        '''
+
+        output = self.output if self.output is not None else sys.stdout
+        output.write(f"{text}\n")
+
+    def fail(self, usage: str, message: str):
+        ''' Fails when an input exception occurs
+
+        Arguments
+        ---------
+        usage: str
+            the usage message, printed before the error
+        message: str
+            the message to print
+
+        Raises
+        ------
+        exception: ParseException
+            if the raise exception flag is set
+        exit: SystemExit
+            otherwise, once the usage and message are printed
+        '''
+
+        if self.raise_exceptions:
+            raise ParseException(message)
+
+        self.print(usage)
+        self.print(message)
+        sys.exit(1)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import io
+import os
+
+from .parse_exception import ParseException
+from .storage import reason as storage_reason
+
+
+class File:
+
+    modes = ["text", "binary", "mmap"]
+
+    def __init__(self,
+            mode: str = "text",
+            buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+            encoding: str = None):
+
+        if mode not in File.modes:
+            raise Exception(f"file mode '{mode}' invalid")
+        if buffer_size < 1:
+            raise Exception(f"file buffer size ({buffer_size}) invalid")
+
+        self.mode = mode
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+
+    def open(self, value: any) -> any:
+        ''' Opens a file for reading, in the requested mode
+
+        Checks the path exists and is readable as a side-effect, so problems
+        are reported while parsing
+
+        - 'text' gives a buffered text reader
+        - 'binary' gives a buffered binary reader
+        - 'mmap' gives a read-only memory map, which can be sliced or wrapped
+          in a memoryview without copying
+
+        Arguments
+        ---------
+        value: any
+            the path to open, as a string or bytes
+
+        Returns
+        -------
+        file: any
+            the opened file, to be closed by the caller; empty files opened
+            in 'mmap' mode give empty bytes, since they can't be mapped
+
+        Raises
+        ------
+        exception: ParseException
+            if the path couldn't be opened
+        '''
+
+        mode = "r" if self.mode == "text" else "rb"
+        encoding = self.encoding if self.mode == "text" else None
+
+        try:
+            file = open(value,
+                    mode,
+                    buffering=self.buffer_size,
+                    encoding=encoding)
+        except OSError as error:
+            reason = storage_reason(error)
+            path = os.fsdecode(value)
+            raise ParseException(f"can't open '{path}' ({reason})")
+
+        if self.mode != "mmap":
+            return file
+
+        # The map holds its own reference to the file, which can be closed
+        import mmap
+        with file:
+            try:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return b""
+            except OSError as error:
+                reason = storage_reason(error)
+                path = os.fsdecode(value)
+            raise ParseException(f"can't map '{path}' ({reason})")
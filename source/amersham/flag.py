@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-import inspect
+import enum
+import os
+import pathlib
+import threading
 
+from .choice import Choice
 from .parse_exception import ParseException
+from .type import coerce, managed, Size, Duration, Rate
 
 
 class Flag:
@@ -12,10 +17,19 @@ class Flag:
             canonical_name: str,
             alias: str, 
             type: type, 
-            description = ""):
+            description = "",
+            repeatable: bool = False,
+            count: bool = False,
+            default_factory: callable = None):
         
         if alias and alias[0] == "-":
             raise Exception(f"alias override '{alias}' has hyphen prefix")
+        if repeatable and type not in [list, dict]:
+            raise Exception(f"repeatable '--{name}' not a list or dict")
+        if count and type != int:
+            raise Exception(f"counted '--{name}' not an integer")
+        if default_factory is not None and not callable(default_factory):
+            raise Exception(f"'--{name}' default factory not callable")
 
         name = name.replace(" ", "-")
         name = name.replace("_", "-")
@@ -27,7 +41,50 @@ class Flag:
         self.type = type
 
         self.description = description
-        self.canonical_name = name
+
+        # Repeated lists and dicts accumulate; counts take no value
+        self.repeatable = repeatable
+        self.count = count
+
+        # Factories run once per process, when the flag's first absent
+        self.default_factory = default_factory
+        self.process = None
+        self.value = None
+        self.lock = threading.Lock() if default_factory else None
+    
+    @property
+    def expects_value(self) -> bool:
+        ''' If the flag takes a value, rather than just being present '''
+
+        return self.type != type(None) and not self.count
+
+    def default(self) -> any:
+        ''' Evaluates the flag's default factory, if not already
+
+        Returns
+        -------
+        value: any
+            the factory's value, checked against the flag's type; copied if
+            mutable, so callbacks can't change it for later calls
+        
+        Raises
+        ------
+        exception: Exception
+            if the factory's value isn't of the flag's type
+        '''
+
+        process = os.getpid()
+        if self.process != process:
+            with self.lock:
+                if self.process != process:
+                    self.value = self.default_factory()
+                    self.process = process
+        
+        try:
+            return coerce(self.type, self.value)
+        except ParseException as error:
+            message = f"'--{self.name}' default factory's value {error}"
+            raise Exception(message)
     
     @staticmethod
     def construct(signature: inspect.Parameter, overrides: dict) -> Flag:
@@ -60,10 +117,39 @@ class Flag:
             int,
             bool,
             list,
+            dict,
+            bytes,
+            pathlib.Path,
+            Size,
+            Duration,
+            Rate,
         ]
         flag_type = type(signature.default)
-        if flag_type not in permitted_types:
+        if isinstance(signature.default, pathlib.PurePath):
+            flag_type = pathlib.Path
+
+        # Computed defaults declare their type, since there's no value to
+        # take it from
+        default_factory = overrides.get("default_factory")
+        if default_factory is not None:
+            if "type" not in overrides:
+                raise Exception(f"'--{name}' default factory without type")
+            flag_type = overrides["type"]
+            is_enum = (isinstance(flag_type, type) and 
+                    issubclass(flag_type, enum.Enum))
+            if (flag_type not in permitted_types[1:] and not is_enum):
+                message = f"'--{name}' type ({flag_type}) not supported"
+                raise Exception(message)
+            flag_type = Choice.construct(flag_type, overrides)
+        elif "type" in overrides:
+            raise Exception(f"'--{name}' type without default factory")
+        elif managed(signature.default):
+            flag_type = signature.default
+        elif (flag_type not in permitted_types and 
+                not isinstance(signature.default, enum.Enum)):
             raise Exception(f"'--{name}' type ({flag_type}) not supported")
+        else:
+            flag_type = Choice.construct(flag_type, overrides)
         
         # Evaluate alias, default, description
         alias = overrides["alias"] if "alias" in overrides else ""
@@ -72,20 +158,29 @@ class Flag:
         if "description" in overrides:
             description = overrides["description"]
         
-        return Flag(name, signature.name, alias, flag_type, description)
+        return Flag(name, 
+                signature.name, 
+                alias, 
+                flag_type, 
+                description,
+                repeatable=overrides.get("repeatable", False),
+                count=overrides.get("count", False),
+                default_factory=default_factory)
     
     @staticmethod
-    def parse(flag: str) -> tuple:
+    def parse(flag: any) -> tuple:
         ''' Parses a flag, as present in CLI input
         
+        Bytes flags have their names decoded, but values are left as bytes
+        
         Arguments
         ---------
-        flag: str
-            the flag string representation
+        flag: any
+            the flag string (or bytes) representation
         
         Returns
         -------
-        name, is_alias, value: tuple[str, bool, str]
+        name, is_alias, value: tuple[str, bool, any]
             The flag's fields
         
         Raises
@@ -94,11 +189,11 @@ class Flag:
             if the flag was formatted wrong
         '''
 
-        # Split tokens, check count valid
-        tokens = flag.split('=')
+        # Split name from value; values may contain '='
+        tokens = flag.split(b"=" if isinstance(flag, bytes) else "=", 1)
         
         # Evaluate flag, verbose or aliased
-        identifier = tokens[0]
+        identifier = os.fsdecode(tokens[0])
         is_alias = None
         name = None
         if len(identifier) >= 2 and identifier[:2] == "--":
@@ -117,8 +212,6 @@ class Flag:
 
         identifier = f"-{name}" if is_alias else f"--{name}"
         token_count = len(tokens)
-        if token_count > 2:
-            raise ParseException(f"'{identifier}' has multiple '=' instances")
         
         # Check value, if present
         value = tokens[1] if token_count == 2 else None
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import json
+import os
+
+from .storage import write as storage_write
+
+
+def order(commands: dict, targets: list) -> list:
+    ''' Finds the commands needed to run some targets, dependencies first
+
+    Arguments
+    ---------
+    commands: dict
+        every registered command, by name
+    targets: list
+        the names of the commands wanted
+
+    Returns
+    -------
+    names: list
+        the targets and everything they require, each after what it requires
+
+    Raises
+    ------
+    exception: Exception
+        if a command's unregistered, or there's a cycle
+    '''
+
+    names = []
+    visited = set()
+
+    def visit(name: str, path: list):
+        if name in visited:
+            return
+        if name in path:
+            cycle = " -> ".join(path[path.index(name):] + [name])
+            raise Exception(f"dependency cycle {cycle}")
+        if name not in commands:
+            if path:
+                raise Exception(f"'{path[-1]}' requires unregistered "
+                        f"command '{name}'")
+            raise Exception(f"unrecognized command '{name}'")
+
+        for requirement in commands[name].requires:
+            visit(requirement, path + [name])
+        visited.add(name)
+        names.append(name)
+
+    for target in targets:
+        visit(target, [])
+    return names
+
+
+def digest(command: any,
+        arguments: list,
+        requirements: list,
+        block_size: int = 1 << 16) -> str:
+    ''' Hashes everything a command's run depends on
+
+    Arguments
+    ---------
+    command: Command
+        the command
+    arguments: list
+        the arguments it's run with
+    requirements: list
+        the digests of the commands it requires, so changes propagate
+    block_size: int
+        how much of an input file to read at a time
+
+    Returns
+    -------
+    digest: str
+        the hash, which changes if the command, its arguments or the content
+        of any of its inputs do
+    '''
+
+    checksum = hashlib.sha256(command.identifier.encode())
+    for value in list(arguments) + list(requirements):
+        value = os.fsencode(value)
+        checksum.update(len(value).to_bytes(8, "little") + value)
+
+    for path in command.inputs:
+        checksum.update(os.fsencode(path) + b"\0")
+        try:
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(block_size), b""):
+                    checksum.update(block)
+        except OSError:
+            checksum.update(b"\0missing")
+    return checksum.hexdigest()
+
+
+def load(path: str) -> dict:
+    ''' Reads the digests of commands' last successful runs
+
+    Arguments
+    ---------
+    path: str
+        the state file; if empty, or unreadable, there's no state
+
+    Returns
+    -------
+    state: dict
+        the digests, by command name
+    '''
+
+    if not path:
+        return {}
+    try:
+        with open(path) as file:
+            state = json.load(file)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save(path: str, state: dict):
+    ''' Writes the digests of commands' last successful runs
+
+    Arguments
+    ---------
+    path: str
+        the state file; if empty, nothing's written
+    state: dict
+        the digests, by command name
+    '''
+
+    if not path:
+        return
+
+    storage_write(path, lambda file: json.dump(state, file,
+            indent=2, sort_keys=True))
+
+
+def run(commands: dict,
+        targets: list,
+        call: callable,
+        arguments: dict = {},
+        jobs: int = 1,
+        path: str = "") -> dict:
+    ''' Runs commands in dependency order, skipping those that are current
+
+    A command's skipped if its digest matches its last successful run, and
+    its outputs all exist. Commands whose requirements are done run
+    concurrently, up to the number of jobs
+
+    Arguments
+    ---------
+    commands: dict
+        every registered command, by name
+    targets: list
+        the names of the commands wanted
+    call: callable
+        runs a command, given it and its arguments
+    arguments: dict
+        the arguments to run each command with, by name
+    jobs: int
+        the most commands to run at once
+    path: str
+        the state file, recording digests of successful runs
+
+    Returns
+    -------
+    statuses: dict
+        'ran' or 'skipped', for each command, in the order they finished
+
+    Raises
+    ------
+    exception: Exception
+        if the graph's invalid; or the first exception a command raised,
+        once running commands have finished
+    '''
+
+    if jobs < 1:
+        raise Exception(f"jobs ({jobs}) invalid")
+
+    names = order(commands, targets)
+    state = load(path)
+    digests = {}
+    statuses = {}
+
+    waiting = {name: set(commands[name].requires) for name in names}
+    running = {}
+    error = None
+
+    pool = concurrent.futures.ThreadPoolExecutor(jobs)
+    with pool:
+        while waiting or running:
+
+            # Start everything whose requirements are done
+            ready = [name for name, requirements in waiting.items()
+                    if not requirements and error is None]
+            for name in ready:
+                del waiting[name]
+                command = commands[name]
+                command_arguments = arguments.get(name, [])
+
+                requirements = [digests[requirement]
+                        for requirement in command.requires]
+                digests[name] = digest(command,
+                        command_arguments,
+                        requirements)
+
+                current = (state.get(name) == digests[name] and
+                        all(os.path.exists(output)
+                        for output in command.outputs))
+                if current:
+                    statuses[name] = "skipped"
+                    for requirements in waiting.values():
+                        requirements.discard(name)
+                    continue
+
+                future = pool.submit(call, command, command_arguments)
+                running[future] = name
+
+            # Skipping commands can ready others; failing stops new ones
+            if not running:
+                if not ready:
+                    break
+                continue
+
+            done, _ = concurrent.futures.wait(running,
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    future.result()
+                except BaseException as exception:
+                    if error is None:
+                        error = exception
+                    state.pop(name, None)
+                    continue
+
+                statuses[name] = "ran"
+                state[name] = digests[name]
+                for requirements in waiting.values():
+                    requirements.discard(name)
+
+            # Record progress as it's made, in case the process is killed
+            save(path, state)
+
+    if error is not None:
+        raise error
+    return statuses
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import os
+import sys
+
+
+formats = ["jsonl", "tsv", "table"]
+
+
+def columns(row: any, header: list) -> list:
+    ''' Flattens a row into a list of values
+
+    Arguments
+    ---------
+    row: any
+        a mapping, sequence or scalar
+    header: list
+        the keys to take from mappings, in order
+
+    Returns
+    -------
+    values: list
+        the row's values
+    '''
+
+    if isinstance(row, dict):
+        return [row.get(key, "") for key in header]
+    elif isinstance(row, (list, tuple)):
+        return list(row)
+    return [row]
+
+
+def escape(value: any) -> str:
+    ''' Serializes a value as a single-line TSV field
+
+    Arguments
+    ---------
+    value: any
+        the value
+
+    Returns
+    -------
+    field: str
+        the field, with tabs and newlines escaped
+    '''
+
+    text = value if isinstance(value, str) else f"{value}"
+    if "\t" in text or "\n" in text or "\\" in text:
+        text = text.replace("\\", "\\\\")
+        text = text.replace("\t", "\\t")
+        text = text.replace("\n", "\\n")
+    return text
+
+
+def write(rows: iter,
+        format: str,
+        output: any = None,
+        block_size: int = 1 << 16,
+        sample_size: int = 100) -> int:
+    ''' Streams rows to an output, a block at a time
+
+    - 'jsonl' writes each row as a line of JSON
+    - 'tsv' writes tab-separated values, with a header for mappings
+    - 'table' aligns columns, sized from the first few rows
+
+    Stops quietly if the reader goes away (as with '| head'); memory use
+    doesn't grow with the number of rows
+
+    Arguments
+    ---------
+    rows: iter
+        the rows; mappings, sequences or scalars
+    format: str
+        one of 'jsonl', 'tsv' or 'table'
+    output: any
+        the file to write to; stdout by default
+    block_size: int
+        roughly how many characters to buffer between writes
+    sample_size: int
+        how many rows to size table columns from
+
+    Returns
+    -------
+    count: int
+        the number of rows written
+
+    Raises
+    ------
+    exception: Exception
+        if the format isn't supported
+    '''
+
+    if format not in formats:
+        raise Exception(f"output format '{format}' unsupported")
+    output = output if output is not None else sys.stdout
+
+    import json
+
+    rows = iter(rows)
+    buffer = []
+    buffered = 0
+    count = 0
+
+    try:
+
+        # Sample leading rows, for headers and column widths
+        sample = []
+        if format != "jsonl":
+            for row in rows:
+                sample.append(row)
+                if len(sample) == sample_size:
+                    break
+
+        header = []
+        if sample and isinstance(sample[0], dict):
+            header = list(sample[0].keys())
+
+        widths = []
+        if format == "table":
+            table = [header] if header else []
+            table += [[f"{value}" for value in columns(row, header)] 
+                    for row in sample]
+            for row in table:
+                for index, value in enumerate(row):
+                    if index == len(widths):
+                        widths.append(0)
+                    widths[index] = max(widths[index], len(value))
+
+        def serialize(values: list) -> str:
+            if format == "tsv":
+                return "\t".join(escape(value) for value in values) + "\n"
+
+            # Pad all but the last column
+            fields = []
+            last = len(values) - 1
+            for index, value in enumerate(values):
+                text = f"{value}"
+                if index < last and index < len(widths):
+                    text = text.ljust(widths[index])
+                fields.append(text)
+            return "  ".join(fields) + "\n"
+
+        if header:
+            buffer.append(serialize(header))
+
+        for row in sample:
+            buffer.append(serialize(columns(row, header)))
+            count += 1
+        
+        for row in rows:
+            if format == "jsonl":
+                line = json.dumps(row, default=str) + "\n"
+            else:
+                line = serialize(columns(row, header))
+            buffer.append(line)
+            buffered += len(line)
+            count += 1
+
+            if buffered >= block_size:
+                output.write("".join(buffer))
+                buffer.clear()
+                buffered = 0
+
+        output.write("".join(buffer))
+        output.flush()
+
+    except BrokenPipeError:
+
+        # Point stdout at nothing, so flushing at exit doesn't fail again
+        if output is sys.stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            os.close(devnull)
+        if hasattr(rows, "close"):
+            rows.close()
+
+    return count
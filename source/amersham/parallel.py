@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+
+class Parallel:
+
+    executors = ["thread", "process"]
+
+    def __init__(self,
+            parameter: str,
+            reducer: callable = list,
+            executor: str = "thread",
+            chunk_size: int = None):
+
+        if executor not in Parallel.executors:
+            raise Exception(f"executor '{executor}' invalid")
+        if chunk_size is not None and chunk_size < 1:
+            raise Exception(f"chunk size ({chunk_size}) invalid")
+
+        self.parameter = parameter
+        self.reducer = reducer
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def split(self, values: list, jobs: int) -> list:
+        ''' Splits values into contiguous chunks, one per job by default
+
+        Arguments
+        ---------
+        values: list
+            the values to split
+        jobs: int
+            the number of workers
+
+        Returns
+        -------
+        chunks: list
+            the chunks, in order; never empty
+        '''
+
+        size = self.chunk_size
+        if size is None:
+            size = max(1, -(-len(values) // jobs))
+
+        chunks = [values[index:index + size] 
+                for index in range(0, len(values), size)]
+        return chunks if chunks else [values]
+
+    def run(self, identifier: str, call: callable, pack: dict, jobs: int):
+        ''' Runs a command's callback over chunks of its designated parameter
+
+        Arguments
+        ---------
+        identifier: str
+            the command's identifier, for finding it in worker processes
+        call: callable
+            calls the command's callback, given its arguments
+        pack: dict
+            the command's cast arguments
+        jobs: int
+            the number of workers
+
+        Returns
+        -------
+        result: any
+            the reducer's combination of each chunk's result, in order
+        '''
+
+        chunks = self.split(list(pack[self.parameter]), jobs)
+        packs = [{**pack, self.parameter: chunk} for chunk in chunks]
+
+        if jobs == 1 or len(packs) == 1:
+            return self.reducer([call(pack) for pack in packs])
+
+        import concurrent.futures
+        if self.executor == "thread":
+            pool = concurrent.futures.ThreadPoolExecutor(jobs)
+            with pool:
+                return self.reducer(list(pool.map(call, packs)))
+
+        pool = concurrent.futures.ProcessPoolExecutor(jobs)
+        with pool:
+            identifiers = [identifier] * len(packs)
+            return self.reducer(list(pool.map(call_chunk, identifiers, packs)))
+
+
+def call_chunk(identifier: str, pack: dict) -> any:
+    ''' Calls a command's callback in a worker process
+
+    Arguments
+    ---------
+    identifier: str
+        the command's identifier
+    pack: dict
+        the chunk's arguments
+
+    Returns
+    -------
+    result: any
+        whatever the command's callback returns
+    '''
+
+    from .command import Command
+    return Command.lookup(identifier).call(pack)
@@ -1,6 +1,17 @@
 from __future__ import annotations
 
-import inspect
+import enum
+import pathlib
+
+from .choice import Choice
+from .file import File
+from .stream import Stream
+from .type import managed, Size, Duration, Rate
+
+
+class Values(tuple):
+    ''' A variadic parameter's cast values (or files' paths, as given); 
+    passed to the callback as an iterator, but picklable until then '''
 
 
 class Parameter:
@@ -9,7 +20,14 @@ class Parameter:
             name: str, 
             canonical_name: str, 
             type: type, 
-            description: str = ""):
+            description: str = "",
+            variadic: bool = False,
+            unpack: bool = False,
+            minimum: int = 0,
+            maximum: int = None):
+
+        if maximum is not None and maximum < minimum:
+            raise Exception(f"'{name}' maximum ({maximum}) below minimum")
 
         name = name.replace(" ", "-")
         name = name.replace("_", "-")
@@ -20,6 +38,13 @@ class Parameter:
         self.type = type
         
         self.description = description
+
+        # Variadic parameters take the remaining values; unpacked ones are 
+        # passed as '*args', the rest as an iterator
+        self.variadic = variadic or unpack
+        self.unpack = unpack
+        self.minimum = minimum
+        self.maximum = maximum
     
     @staticmethod
     def construct(signature: inspect.Parameter, overrides: dict) -> Parameter:
@@ -43,23 +68,52 @@ class Parameter:
             if there was some configuration problem
         '''
 
+        import inspect
         name = overrides["name"] if "name" in overrides else signature.name
 
+        if signature.kind == inspect.Parameter.VAR_KEYWORD:
+            raise Exception(f"'{name}' keyword variadics not supported")
+        unpack = signature.kind == inspect.Parameter.VAR_POSITIONAL
+        variadic = unpack or overrides.get("variadic", False)
+
         # Evaluate type
         permitted_types = [
             str,
             int,
             bool,
             list,
+            bytes,
+            pathlib.Path,
+            Size,
+            Duration,
+            Rate,
         ]
         parameter_type = signature.annotation
         if parameter_type == inspect.Parameter.empty:
             parameter_type = str
-        elif parameter_type not in permitted_types:
+        elif parameter_type == Stream or parameter_type == File:
+            parameter_type = parameter_type()
+        elif (parameter_type not in permitted_types and
+                not managed(parameter_type) and
+                not (isinstance(parameter_type, type) and 
+                issubclass(parameter_type, enum.Enum))):
             raise Exception(f"'{name}' type ({parameter_type}) not supported")
         
+        # Enumerations, or listed choices
+        parameter_type = Choice.construct(parameter_type, overrides)
+        
+        if variadic and managed(parameter_type):
+            raise Exception(f"'{name}' variadic can't be a stream or file")
+        
         description = ""
         if "description" in overrides:
             description = overrides["description"]
         
-        return Parameter(name, signature.name, parameter_type, description)
\ No newline at end of file
+        return Parameter(name, 
+                signature.name, 
+                parameter_type, 
+                description,
+                variadic=variadic,
+                unpack=unpack,
+                minimum=overrides.get("minimum", 0),
+                maximum=overrides.get("maximum", None))
\ No newline at end of file
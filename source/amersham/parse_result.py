@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from .command import Command
+from .context import Context
+
+
+class ParseResult:
+
+    __slots__ = ("command", "arguments", "handles")
+
+    def __init__(self, command: Command, pack: dict, handles: list = []):
+        object.__setattr__(self, "command", command)
+        object.__setattr__(self, "arguments", tuple(pack.items()))
+        object.__setattr__(self, "handles", tuple(handles))
+
+    def __setattr__(self, name: str, value: any):
+        raise AttributeError("parse results are immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("parse results are immutable")
+
+    def __eq__(self, other: any) -> bool:
+        if not isinstance(other, ParseResult):
+            return NotImplemented
+        return (self.command is other.command and 
+                self.arguments == other.arguments)
+
+    def __repr__(self) -> str:
+        return f"ParseResult({self.name!r}, {self.kwargs!r})"
+
+    def __reduce__(self) -> tuple:
+        
+        # Open files can't be sent elsewhere
+        if self.handles:
+            raise TypeError(f"'{self.name}' parse result holds open files")
+        return (ParseResult.restore, (self.command.identifier, self.arguments))
+
+    @staticmethod
+    def restore(identifier: str, arguments: tuple) -> ParseResult:
+        ''' Rebuilds an unpickled parse result
+
+        Arguments
+        ---------
+        identifier: str
+            the command's identifier
+        arguments: tuple
+            the cast arguments, as name-value pairs
+        
+        Returns
+        -------
+        result: ParseResult
+            the rebuilt result
+        '''
+
+        return ParseResult(Command.lookup(identifier), dict(arguments))
+
+    @property
+    def name(self) -> str:
+        ''' The command's name '''
+
+        return self.command.name
+
+    @property
+    def kwargs(self) -> dict:
+        ''' The cast arguments, keyed by the callback's argument names '''
+
+        return dict(self.arguments)
+
+    def invoke(self, context: Context = None) -> any:
+        ''' Runs the command with the parsed arguments
+
+        Closes any files opened while parsing, afterwards
+
+        Arguments
+        ---------
+        context: Context
+            where iterators are streamed to, if the command has an output 
+            format; defaults to one using the command's raise exceptions flag
+
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns, or None if streamed
+        '''
+
+        if context is None:
+            context = Context(self.command.raise_exceptions)
+        try:
+            return self.command.execute(self.kwargs, context)
+        finally:
+            for handle in self.handles:
+                handle.close()
@@ -1,6 +1,18 @@
+import os
+import sys
+import time
+
+from .cache import Cache
+from .choice import Choice
 from .command import Command
+from .context import Context
 from .table import serialize as table_serialize
 from .parse_exception import ParseException
+from .parse_result import ParseResult
+from .plugin import Plugin, index as plugin_index
+from .resource import Resource
+from .storage import reason as storage_reason
+from .trace import Tracer
 
 
 class Parser:
@@ -8,19 +20,39 @@ class Parser:
     def __init__(self, 
             name: str, 
             description: str = "", 
-            raise_exceptions: bool = False):
+            raise_exceptions: bool = False,
+            tracer: Tracer = None,
+            search_cache: str = ""):
         
         self.name = name
 
         self.description = description
         self.raise_exceptions = raise_exceptions
+        self.tracer = tracer
+        self.search_cache = search_cache
 
         self.commands = []
+        self.resources = {}
+
+        self.frozen = False
+        self.index = {}
+        self.search_index = None
     
     def command(self, 
             name = "", 
             description = "", 
             raise_exceptions = False,
+            cache = None,
+            parallel = None,
+            output = "",
+            pipe = "",
+            requires = [],
+            inputs = [],
+            outputs = [],
+            columnar = False,
+            exclusive = [],
+            require_one = [],
+            depends = {},
             **overrides) -> callable:
         ''' Decorator for registering a command with the parser
         
@@ -36,6 +68,35 @@ class Parser:
         raise_exceptions: bool
             set this value if you want the parser to fail silently, passing
             user input exceptions back for you to handle yourself
+        cache: Cache
+            memoizes results, for commands which are pure functions of their
+            arguments; pass True for an in-memory cache with default settings
+        parallel: Parallel
+            splits a list or variadic argument into chunks, run by a pool of
+            '--jobs' workers
+        output: str
+            streams iterators the command returns to stdout, rather than
+            returning them; one of 'jsonl', 'tsv' or 'table'
+        pipe: str
+            the parameter taking the previous command's result, when this
+            one follows '++' in a pipeline
+        requires: list
+            the names of commands to run before this one, in a graph
+        inputs: list
+            files the command reads; it's only run again in a graph once
+            their content, or its arguments, change
+        outputs: list
+            files the command writes; it's run again in a graph if any are
+            missing
+        columnar: bool
+            set if the callback takes whole columns of values, when run over
+            a table
+        exclusive: list
+            groups of flag names, of which at most one can be given
+        require_one: list
+            groups of flag names, of which at least one must be given
+        depends: dict
+            the flag names each flag needs given alongside it
         overrides: dict
             optional overrides for the command's arguments
         
@@ -50,17 +111,80 @@ class Parser:
             if there was some configuration error
         '''
         
+        if cache is True:
+            cache = Cache()
+
         def wrapper(functor: callable) -> callable:
             command = Command.construct(functor, 
                     self.name,
                     overrides,
                     name=name, 
                     description=description, 
-                    raise_exceptions=raise_exceptions)
+                    raise_exceptions=raise_exceptions,
+                    cache=cache,
+                    parallel=parallel,
+                    output=output,
+                    pipe=pipe,
+                    resources=self.resources,
+                    requires=requires,
+                    inputs=inputs,
+                    outputs=outputs,
+                    columnar=columnar,
+                    exclusive=exclusive,
+                    require_one=require_one,
+                    depends=depends)
             self.add_command(command)
 
             return functor
         return wrapper
+
+    def resource(self, name: str, size: int = None) -> callable:
+        ''' Decorator for registering a pooled resource's factory
+
+        Commands registered afterwards with an argument of the same name are
+        passed an instance of the resource, rather than parsing it. Each
+        process keeps a pool of instances; a call takes one that's free, or
+        creates one, and returns it once the callback does, so concurrent
+        calls never share an instance. Generator factories yield the
+        instance, and tear it down after the yield on exit or when the
+        parser's closed
+        
+        Arguments
+        ---------
+        name: str
+            the name of the arguments the resource's passed as
+        size: int
+            the most instances each process creates; calls wait for one to
+            be free beyond that. Unlimited by default
+        
+        Returns
+        -------
+        decorator: callable
+            registers the factory
+        
+        Raises
+        ------
+        exception: Exception
+            if the name's taken, the size is invalid, or the parser's frozen
+        '''
+
+        if self.frozen:
+            raise Exception(f"'{self.name}' frozen")
+        if name in self.resources:
+            raise Exception(f"resource '{name}' already registered")
+        if size is not None and size < 1:
+            raise Exception(f"resource '{name}' size ({size}) invalid")
+
+        def wrapper(factory: callable) -> callable:
+            self.resources[name] = Resource(name, factory, size)
+            return factory
+        return wrapper
+
+    def close(self):
+        ''' Tears down this process's instances of the parser's resources '''
+
+        for resource in self.resources.values():
+            resource.close()
     
     def add_command(self, command: Command):
         ''' Adds a command
@@ -73,14 +197,63 @@ class Parser:
         Raises
         ------
         exception: Exception
-            if you messed up somehow with the command
+            if you messed up somehow with the command, or the parser's frozen
         '''
 
+        if self.frozen:
+            raise Exception(f"'{self.name}' frozen")
         if self.get_command(command.name):
             raise Exception(f"'{command.name}' already registered")
+        if isinstance(command, Command):
+            command.register()
         command.raise_exceptions = self.raise_exceptions
         self.commands.append(command)
+        self.search_index = None
     
+    def discover(self, group: str, index: str = None) -> list:
+        ''' Registers commands from installed packages' entry points
+
+        Each entry point in the group names a command, and points at a
+        function or command object. Entry points are indexed in a file, so
+        later startups read that instead of scanning packages; plugins are
+        only imported when their command is run
+        
+        Arguments
+        ---------
+        group: str
+            the entry point group, such as 'app.commands'
+        index: str
+            where to cache the index; defaults to the user's cache directory,
+            and an empty string disables caching
+        
+        Returns
+        -------
+        names: list
+            the names of the commands registered
+        
+        Raises
+        ------
+        exception: Exception
+            if a plugin's name clashes with a registered command
+        '''
+
+        if index is None:
+            cache = os.environ.get("XDG_CACHE_HOME")
+            if not cache:
+                cache = os.path.join(os.path.expanduser("~"), ".cache")
+            index = os.path.join(cache, "amersham", f"{group}.json")
+        
+        names = []
+        for entry in plugin_index(group, index):
+            plugin = Plugin(self.name, 
+                    entry["name"], 
+                    entry["value"], 
+                    entry["description"],
+                    self.resources)
+            self.add_command(plugin)
+            names.append(plugin.name)
+        return names
+
     def get_command(self, name: str) -> Command:
         ''' Gets a command of a given name
         
@@ -95,18 +268,24 @@ class Parser:
             the fetched command, or None if there was no match
         '''
 
+        if self.frozen:
+            return self.index.get(name)
+
         for command in self.commands:
             if command.name == name:
                 return command
         return None
 
-    def fail(self, message: str):
+    def fail(self, message: str, context: Context = None):
         ''' Fails when an input exception occurs
         
         Arguments
         ---------
         message: str
             the message to print
+        context: Context
+            the invocation's context; defaults to one using the parser's
+            raise exceptions flag
         
         Raises
         ------
@@ -115,22 +294,109 @@ class Parser:
             where the user wants to handle exceptions themselves
         '''
 
-        if self.raise_exceptions:
-            raise ParseException(message)
-        else:
-            print(self.usage())
-            print(message)
-            exit(1)
+        if context is None:
+            context = Context(self.raise_exceptions)
+        context.fail(self.usage(), message)
+
+    def freeze(self):
+        ''' Prevents further changes to the parser and its commands
+
+        Once setup is done, freezing makes sharing one parser between threads
+        safe: runs keep all their state in a per-call context
+        '''
+
+        for command in self.commands:
+            command.freeze()
+        self.commands = tuple(self.commands)
+        self.index = {command.name: command for command in self.commands}
+        self.frozen = True
     
-    def help(self) -> str:
+    def search(self, term: str, page: int = 1, size: int = 10) -> list:
+        ''' Finds commands by name, flags and description
+
+        Names count for more than flags, and flags more than descriptions.
+        The index is built on first search, and cached on disk if the parser
+        has a search cache path
+        
+        Arguments
+        ---------
+        term: str
+            the words to search for; each must match, or prefix, a word
+        page: int
+            which page of results to return, from one
+        size: int
+            how many results make a page
+        
+        Returns
+        -------
+        commands: list
+            the page's commands, best match first
+        '''
+
+        commands, _ = self.rank(term, page * size)
+        return commands[(page - 1) * size:]
+
+    def rank(self, term: str, limit: int = None) -> tuple:
+        ''' Ranks the commands matching a search term
+
+        Arguments
+        ---------
+        term: str
+            the search term
+        limit: int
+            how many of the best matches to return; all of them, if None
+        
+        Returns
+        -------
+        commands, count: tuple[list, int]
+            the best matching commands, best first, and how many matched
+        '''
+
+        from .search import Index as SearchIndex
+        index = self.search_index
+        if index is None:
+            index = SearchIndex.build(self.commands, self.search_cache)
+            self.search_index = index
+        
+        positions, count = index.search(term, limit)
+        return ([self.commands[position] for position in positions], count)
+
+    def help(self, term: str = "", page: int = 1, size: int = 10) -> str:
         ''' Serializes an informative help message
         
+        Arguments
+        ---------
+        term: str
+            if given, only commands matching it are listed
+        page: int
+            which page of matches to list, from one
+        size: int
+            how many matches make a page
+        
         Returns
         -------
         help: str
             the help message
         '''
 
+        if term:
+            commands, count = self.rank(term, page * size)
+            if not count:
+                return f"no commands match '{term}'"
+            
+            start = (page - 1) * size
+            result = f"commands matching '{term}'"
+            if start >= count:
+                return f"{result} (none on page {page})"
+            result += f" ({start + 1}-{start + len(commands[start:])} " \
+                    f"of {count})"
+
+            command_table = []
+            for command in commands[start:]:
+                command_table.append([command.name, command.description])
+            commands = table_serialize(command_table, "  ", "\n  ")
+            return f"{result}\n  {commands}"
+
         if len(self.commands) == 1:
             return self.commands[0].help(root=True)
 
@@ -175,7 +441,7 @@ class Parser:
         
         return result
 
-    def run(self, arguments: list) -> any:
+    def run(self, arguments: list, context: Context = None) -> any:
         ''' Runs the parser
 
         Takes user CLI input and formats its flags and parameters into
@@ -186,11 +452,347 @@ class Parser:
         ---------
         arguments: list
             the arguments (stripped of path directory)
+        context: Context
+            per-call error handling and output; defaults to one using the
+            parser's raise exceptions flag, writing to stdout
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the user's input was wrong, somehow
+        error: Exception
+            if the parser was set-up incorrectly
+        '''
+
+        return self.trace(lambda context: self.dispatch(arguments, context),
+                context)
+
+    def run_json(self, payload: any, context: Context = None) -> any:
+        ''' Runs a command with already-typed arguments, skipping tokenizing
+
+        The payload's an object with a 'command' name (which can be left out
+        if there's only one), 'flags' by name, and a list of 'parameters'
+        
+        Arguments
+        ---------
+        payload: any
+            the payload, or its JSON text
+        context: Context
+            per-call error handling and output; defaults to one using the
+            parser's raise exceptions flag, writing to stdout
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the payload was malformed, or a value of the wrong type; 
+            messages match those for command-line arguments
+        error: Exception
+            if the parser was set-up incorrectly
+        '''
+
+        return self.trace(
+                lambda context: self.dispatch_json(payload, context),
+                context)
+
+    def trace(self, dispatch: callable, context: Context) -> any:
+        ''' Calls a dispatch method, tracing it if the parser has a tracer
+        
+        Arguments
+        ---------
+        dispatch: callable
+            runs the invocation, given its context
+        context: Context
+            per-call error handling and output, or None for the default
+        
+        Returns
+        -------
+        result: any
+            whatever the dispatch method returns
+        '''
+
+        if context is None:
+            context = Context(self.raise_exceptions)
+
+        if not self.tracer:
+            return dispatch(context)
+        
+        # Trace the invocation, however it ends
+        trace = self.tracer.start()
+        context = Context(context.raise_exceptions, context.output, trace)
+        try:
+            return dispatch(context)
+        except BaseException as error:
+            trace.fail(error)
+            raise
+        finally:
+            self.tracer.write(trace)
+
+    def dispatch(self, arguments: list, context: Context) -> any:
+        ''' Finds the relevant command, and runs it
+        
+        Arguments
+        ---------
+        arguments: list
+            the arguments (stripped of path directory)
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        result: any
+            whatever the command's callback returns
+        '''
+
+        if "++" in arguments or b"++" in arguments:
+            return self.pipeline(arguments, context)
+
+        # Arguments given as JSON, inline or in a file
+        first = os.fsdecode(arguments[0]) if arguments else ""
+        if first.startswith("--args-json="):
+            if len(arguments) > 1:
+                self.fail("'--args-json' followed by other arguments", context)
+            
+            value = first[len("--args-json="):]
+            if value.startswith("@"):
+                path = value[1:]
+                try:
+                    if path == "-":
+                        value = sys.stdin.read()
+                    else:
+                        with open(path) as file:
+                            value = file.read()
+                except OSError as error:
+                    reason = storage_reason(error)
+                    self.fail(f"'--args-json' can't open '{path}' ({reason})",
+                            context)
+            return self.dispatch_json(value, context)
+
+        command, arguments, root = self.resolve(arguments, context)
+        if not command:
+            return None
+
+        if context.trace:
+            context.trace.command = command.name
+        return command.run(arguments, root=root, context=context)
+
+    def dispatch_json(self, payload: any, context: Context) -> any:
+        ''' Finds the command a JSON payload's for, and runs it
+        
+        Arguments
+        ---------
+        payload: any
+            the payload, or its JSON text
+        context: Context
+            the invocation's context
         
         Returns
         -------
         result: any
             whatever the command's callback returns
+        '''
+
+        if isinstance(payload, (str, bytes)):
+            import json
+            try:
+                payload = json.loads(payload)
+            except ValueError as error:
+                message = f"'--args-json' invalid ({error.msg.lower()})"
+                self.fail(message, context)
+        
+        if not isinstance(payload, dict):
+            self.fail("'--args-json' expects an object", context)
+        for key in payload:
+            if key not in ["command", "flags", "parameters"]:
+                self.fail(f"'--args-json' key '{key}' unexpected", context)
+        
+        flags = payload.get("flags", {})
+        parameters = payload.get("parameters", [])
+        if not isinstance(flags, dict):
+            self.fail("'--args-json' flags expects an object", context)
+        if not isinstance(parameters, list):
+            self.fail("'--args-json' parameters expects a list", context)
+
+        # Find the command, unless it's the only one
+        command = None
+        if len(self.commands) == 1 and "command" not in payload:
+            command = self.commands[0]
+        elif "command" not in payload:
+            self.fail("expected a command", context)
+        elif not self.commands:
+            raise Exception("no registered commands")
+        else:
+            command_name = payload["command"]
+            if isinstance(command_name, str):
+                command = self.get_command(command_name)
+            if not command:
+                self.fail(f"unrecognized command '{command_name}'", context)
+        
+        if context.trace:
+            context.trace.command = command.name
+        return command.run_json(flags, parameters, context)
+
+    def pipeline(self, arguments: list, context: Context) -> any:
+        ''' Runs commands separated by '++', passing results along
+
+        Every stage is parsed before any are run; each one after the first
+        gets the previous stage's result (or iterator) as its pipe parameter
+        
+        Arguments
+        ---------
+        arguments: list
+            the arguments (stripped of path directory)
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        result: any
+            whatever the last command's callback returns
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the user's input was wrong, somehow
+        '''
+
+        # Split stages
+        stages = [[]]
+        for argument in arguments:
+            if argument == "++" or argument == b"++":
+                stages.append([])
+            else:
+                stages[-1].append(argument)
+        
+        handles = []
+        try:
+
+            # Parse every stage up-front
+            commands = []
+            packs = []
+            for index, stage in enumerate(stages):
+                if not stage:
+                    self.fail("empty pipeline stage", context)
+
+                command, stage, _ = self.resolve(stage, context)
+                if not command:
+                    return None
+                if index and not command.pipe:
+                    message = f"'{command.name}' doesn't accept piped input"
+                    self.fail(message, context)
+                first = os.fsdecode(stage[0]) if stage else ""
+                if first == "--help" or first == "-h":
+                    self.fail(f"'{first}' in pipeline", context)
+                
+                pack = command.parse(stage, handles, context, piped=index > 0)
+                commands.append(command)
+                packs.append(pack)
+            
+            if context.trace:
+                names = [command.name for command in commands]
+                context.trace.command = " ++ ".join(names)
+                context.trace.begin_callback()
+            
+            # Run them, in order
+            result = None
+            for index, command in enumerate(commands):
+                pack = packs[index]
+                output_format = pack.pop("--format", command.output)
+                if index:
+                    pack[command.pipe] = result
+                result = command.invoke(pack, context)
+
+            if context.trace:
+                context.trace.end_callback()
+            return command.stream(result, output_format, context)
+
+        finally:
+            for handle in handles:
+                handle.close()
+
+    def run_graph(self,
+            targets: list,
+            jobs: int = 1,
+            arguments: dict = {},
+            state: str = None,
+            context: Context = None) -> dict:
+        ''' Runs commands and everything they require, like make
+
+        Commands run once what they require has; independent commands run
+        concurrently. A command's skipped if its arguments, the content of
+        its inputs and what it requires haven't changed since it last ran
+        successfully, and its outputs exist
+        
+        Arguments
+        ---------
+        targets: list
+            the names of the commands to run
+        jobs: int
+            the most commands to run at once
+        arguments: dict
+            the arguments (as from the command line) to run commands with, by
+            name; commands not listed are run without any
+        state: str
+            the file recording successful runs; defaults to one named after
+            the parser, in the working directory, and an empty string
+            disables skipping
+        context: Context
+            per-call error handling and output; defaults to one using the
+            parser's raise exceptions flag, writing to stdout
+        
+        Returns
+        -------
+        statuses: dict
+            'ran' or 'skipped', by command name, in the order they finished
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if a command's arguments were wrong
+        error: Exception
+            if the graph's invalid, or a command raised an exception; other
+            commands already running are finished first
+        '''
+
+        if context is None:
+            context = Context(self.raise_exceptions)
+        if state is None:
+            state = f".{self.name}-state.json"
+
+        commands = {command.name: command for command in self.commands}
+
+        def call(command: Command, arguments: list):
+            return command.run(arguments, context=context)
+
+        from .graph import run as graph_run
+        return graph_run(commands, targets, call, arguments, jobs, state)
+
+    def resolve(self, arguments: list, context: Context) -> tuple:
+        ''' Finds the command an invocation's for
+
+        Prints the parser's help message, if asked for
+        
+        Arguments
+        ---------
+        arguments: list
+            the arguments (stripped of path directory)
+        context: Context
+            the invocation's context
+        
+        Returns
+        -------
+        command, arguments, root: tuple[Command, list, bool]
+            the command (None if help was printed), its arguments, and
+            whether it's the only command registered
         
         Raises
         ------
@@ -203,7 +805,7 @@ class Parser:
         # Check arguments non-empty
         for argument in arguments:
             if not argument:
-                self.fail("empty argument")
+                self.fail("empty argument", context)
 
         # Check command(s) registered
         command_count = len(self.commands)
@@ -211,33 +813,225 @@ class Parser:
             raise Exception("no registered commands")
 
         # Given just 1 command, run it right away
-        command = None
         if command_count == 1:
-            return self.commands[0].run(arguments, root=True)
+            return (self.commands[0], arguments, True)
 
         # Given options, at least one argument (command name) needed
         if not arguments:
-            self.fail("expected a command")
+            self.fail("expected a command", context)
         
-        # Handle help; check no trailing garbage
-        command_name = arguments[0]
+        # Handle help, or a search; check no trailing garbage
+        command_name = os.fsdecode(arguments[0])
         argument_count = len(arguments)
         if command_name == "--help" or command_name == "-h":
-            if argument_count > 1:
-                self.fail(f"'{command_name}' followed by other arguments")
-            else:
-                print(self.help())
-                return None
+            if argument_count > 3:
+                message = f"'{command_name}' followed by other arguments"
+                self.fail(message, context)
+            
+            term = os.fsdecode(arguments[1]) if argument_count > 1 else ""
+            page = os.fsdecode(arguments[2]) if argument_count > 2 else "1"
+            if not page.isdigit() or int(page) < 1:
+                message = f"'{command_name}' page expects a positive " \
+                        f"integer, got '{page}'"
+                self.fail(message, context)
+            
+            context.print(self.help(term, int(page)))
+            return (None, [], False)
         
         # Check command name (not flag) given
         if command_name[0] == "-":
-            self.fail(f"expected command, not '{command_name}'")
+            self.fail(f"expected command, not '{command_name}'", context)
         
         # Find command
         command = self.get_command(command_name)
         if not command:
-            self.fail(f"unrecognized command '{command_name}'")
+            self.fail(f"unrecognized command '{command_name}'", context)
             
-        # Trim command name, run command
-        arguments = arguments[1:]
-        return command.run(arguments)
\ No newline at end of file
+        # Trim command name
+        return (command, arguments[1:], False)
+
+    def parse(self, arguments: list, context: Context = None) -> ParseResult:
+        ''' Parses arguments without running the command
+
+        The result can be invoked later, or pickled and sent elsewhere
+        
+        Arguments
+        ---------
+        arguments: list
+            the arguments (stripped of path directory)
+        context: Context
+            per-call error handling and output; defaults to one using the
+            parser's raise exceptions flag, writing to stdout
+        
+        Returns
+        -------
+        result: ParseResult
+            the command and its cast arguments, or None if help was printed
+        
+        Raises
+        ------
+        parse_error: ParseException
+            if the user's input was wrong, somehow
+        error: Exception
+            if the parser was set-up incorrectly
+        '''
+
+        if context is None:
+            context = Context(self.raise_exceptions)
+
+        command, arguments, root = self.resolve(arguments, context)
+        if not command:
+            return None
+
+        # Let the command print its own help
+        first = os.fsdecode(arguments[0]) if arguments else ""
+        if first == "--help" or first == "-h":
+            return command.run(arguments, root=root, context=context)
+
+        handles = []
+        try:
+            pack = command.parse(arguments, handles, context)
+        except BaseException:
+            for handle in handles:
+                handle.close()
+            raise
+        return ParseResult(command, pack, handles)
+
+    def complete(self, line: str, text: str) -> list:
+        ''' Suggests completions for the word being typed in a shell
+        
+        Arguments
+        ---------
+        line: str
+            the line typed so far
+        text: str
+            the word being completed, at the end of the line
+        
+        Returns
+        -------
+        completions: list
+            the commands, flags or choices which could complete the word
+        '''
+
+        tokens = line[:len(line) - len(text)].split()
+
+        # Complete command names first, unless there's only one command
+        command = None
+        if len(self.commands) == 1:
+            command = self.commands[0]
+        elif not tokens:
+            candidates = [command.name for command in self.commands]
+            candidates += ["--help", "exit"]
+            return [name for name in candidates if name.startswith(text)]
+        else:
+            command = self.get_command(tokens[0])
+        
+        if not command:
+            return []
+        
+        # Complete choices for flag values
+        if text.startswith("--") and "=" in text:
+            name, prefix = text[2:].split("=", 1)
+            flag = command.get_flag(name, False)
+            if not flag or not isinstance(flag.type, Choice):
+                return []
+            return [f"--{name}={label}" 
+                    for label in flag.type.complete(prefix)]
+        
+        # Complete choices for parameters
+        candidates = []
+        if not text.startswith("-"):
+            if len(self.commands) != 1:
+                tokens = tokens[1:]
+            index = len([token for token in tokens if token[0] != "-"])
+            parameters = command.parameters
+            if parameters and parameters[-1].variadic:
+                index = min(index, len(parameters) - 1)
+            if (index < len(parameters) and
+                    isinstance(parameters[index].type, Choice)):
+                candidates += parameters[index].type.complete(text)
+            if text:
+                return candidates
+        
+        candidates.append("--help")
+        for flag in command.flags:
+            hint = "=" if flag.expects_value else ""
+            candidates.append(f"--{flag.name}{hint}")
+        return [name for name in candidates if name.startswith(text)]
+
+    def shell(self, prompt: str = "", history: str = ""):
+        ''' Runs commands interactively, until 'exit' or end-of-file
+
+        Lines are split with shell rules and run in-process, so commands stay
+        imported between runs; user errors are printed rather than exiting,
+        and each command's result and duration are shown
+        
+        Arguments
+        ---------
+        prompt: str
+            the prompt shown, defaults to the parser's name
+        history: str
+            a file to load and save line history from, if readline is
+            available
+        '''
+
+        import shlex
+        try:
+            import readline
+        except ImportError:
+            readline = None
+        
+        if readline:
+            readline.set_completer(lambda text, state: (
+                    self.complete(readline.get_line_buffer(), text) + 
+                    [None])[state])
+            readline.set_completer_delims(" \t\n")
+            readline.parse_and_bind("tab: complete")
+            if history and os.path.exists(history):
+                readline.read_history_file(history)
+
+        prompt = prompt if prompt else f"{self.name}> "
+
+        # Raise rather than exit on user errors
+        context = Context(raise_exceptions=True)
+
+        try:
+            while True:
+                try:
+                    line = input(prompt)
+                except EOFError:
+                    print()
+                    break
+                except KeyboardInterrupt:
+                    print()
+                    continue
+
+                try:
+                    arguments = shlex.split(line)
+                except ValueError as error:
+                    print(f"{error}".lower())
+                    continue
+                
+                if not arguments:
+                    continue
+                elif arguments == ["exit"]:
+                    break
+
+                start = time.perf_counter()
+                try:
+                    result = self.run(arguments, context)
+                    if result is not None:
+                        print(result)
+                except ParseException as error:
+                    print(error)
+                except KeyboardInterrupt:
+                    print()
+                except (Exception, SystemExit) as error:
+                    print(f"{type(error).__name__}: {error}")
+                
+                duration = time.perf_counter() - start
+                print(f"({duration:.3f}s)")
+        
+        finally:
+            if readline and history:
+                readline.write_history_file(history)
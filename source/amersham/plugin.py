@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import threading
+
+from .command import Command
+from .storage import write as storage_write
+
+
+class Plugin:
+
+    def __init__(self,
+            parser_name: str,
+            name: str,
+            value: str,
+            description: str = "",
+            resources: dict = {}):
+
+        name = name.replace(" ", "-")
+        name = name.replace("_", "-")
+        name = name.lower()
+
+        self.parser_name = parser_name
+        self.name = name
+        self.value = value
+        self.description = description
+        self.resources = resources
+
+        self.raise_exceptions = False
+        self.frozen = False
+
+        self.command = None
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> any:
+
+        # Anything else needs the command itself
+        if name in ["command", "lock"]:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    @staticmethod
+    def target(value: str) -> any:
+        ''' Imports an entry point's target
+
+        Arguments
+        ---------
+        value: str
+            the entry point's value, as 'module:attribute'
+
+        Returns
+        -------
+        target: any
+            the imported object
+        '''
+
+        value = value.split("[")[0].strip()
+        module_name, _, attributes = value.partition(":")
+
+        target = importlib.import_module(module_name.strip())
+        for attribute in attributes.strip().split("."):
+            if attribute:
+                target = getattr(target, attribute)
+        return target
+
+    def load(self) -> Command:
+        ''' Imports the plugin, constructing its command on first use
+
+        Returns
+        -------
+        command: Command
+            the plugin's command
+
+        Raises
+        ------
+        exception: Exception
+            if the plugin's target isn't a command or function
+        '''
+
+        if self.command:
+            return self.command
+
+        with self.lock:
+            if self.command:
+                return self.command
+
+            target = Plugin.target(self.value)
+            if isinstance(target, Command):
+                command = target
+            elif callable(target):
+                command = Command.construct(target, 
+                        self.parser_name,
+                        name=self.name,
+                        description=self.description,
+                        resources=self.resources)
+            else:
+                raise Exception(f"plugin '{self.name}' target not callable")
+
+            command.parser_name = self.parser_name
+            command.name = self.name
+            command.raise_exceptions = self.raise_exceptions
+            command.register()
+            if self.frozen:
+                command.freeze()
+            
+            self.command = command
+        return command
+
+    def freeze(self):
+        ''' Freezes the command, once it's loaded '''
+
+        self.frozen = True
+        if self.command:
+            self.command.freeze()
+
+
+def entry_points(group: str) -> list:
+    ''' Lists the installed entry points in a group
+
+    Arguments
+    ---------
+    group: str
+        the group's name
+
+    Returns
+    -------
+    entry_points: list
+        the entry points
+    '''
+
+    import importlib.metadata
+
+    points = importlib.metadata.entry_points()
+    if hasattr(points, "select"):
+        return list(points.select(group=group))
+    return list(points.get(group, []))
+
+
+def fingerprint(group: str) -> str:
+    ''' Summarises the environment's installed packages
+
+    Distributions are found through their metadata directories, whose names
+    carry their versions; hashing those names and modification times is
+    much cheaper than reading every distribution's entry points. Other
+    files on the import path, such as the working directory's, are ignored
+
+    Arguments
+    ---------
+    group: str
+        the entry point group being indexed
+
+    Returns
+    -------
+    fingerprint: str
+        a digest, which changes when packages do
+    '''
+
+    import hashlib
+    digest = hashlib.sha256(group.encode())
+    digest.update(sys.version.encode())
+    for path in sys.path:
+        try:
+            entries = os.scandir(path or ".")
+        except OSError:
+            continue
+
+        metadata = []
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith((".dist-info", ".egg-info")):
+                    continue
+                try:
+                    modified = entry.stat().st_mtime_ns
+                except OSError:
+                    modified = 0
+                metadata.append(f"{entry.name}\0{modified}")
+
+        for name in sorted(metadata):
+            digest.update(f"{path}\0{name}\0".encode())
+    return digest.hexdigest()
+
+
+def index(group: str, path: str) -> list:
+    ''' Loads the index of a group's plugins, rebuilding it if stale
+
+    Rebuilding imports every plugin, to read its description
+
+    Arguments
+    ---------
+    group: str
+        the entry point group
+    path: str
+        where the index is cached; if empty, it isn't
+
+    Returns
+    -------
+    entries: list
+        a dict per plugin, holding its name, value, description and
+        distribution
+    '''
+
+    import json
+    key = fingerprint(group)
+    if path:
+        try:
+            with open(path) as file:
+                cached = json.load(file)
+            if cached["fingerprint"] == key:
+                return cached["commands"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    entries = []
+    for point in entry_points(group):
+        target = Plugin.target(point.value)
+        if isinstance(target, Command):
+            description = target.description
+        else:
+            documentation = getattr(target, "__doc__", None) or ""
+            lines = documentation.strip().splitlines()
+            description = lines[0].strip() if lines else ""
+        
+        distribution = getattr(point, "dist", None)
+        entries.append({
+            "name": point.name,
+            "value": point.value,
+            "description": description,
+            "distribution": distribution.metadata["Name"] 
+                    if distribution else "",
+            "version": distribution.version if distribution else "",
+        })
+
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            storage_write(path, lambda file: json.dump(
+                    {"fingerprint": key, "commands": entries}, file))
+        except OSError:
+            pass
+
+    return entries
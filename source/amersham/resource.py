@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import types
+
+
+class Resource:
+
+    def __init__(self, name: str, factory: callable, size: int = None):
+        if size is not None and size < 1:
+            raise Exception(f"resource '{name}' size ({size}) invalid")
+
+        self.name = name
+        self.factory = factory
+        self.size = size
+
+        # Each process has its own pool; forked workers can't share
+        # connections with their parent. Instances are [value, generator,
+        # generation] entries, and closing starts a new generation
+        self.process = None
+        self.idle = []
+        self.busy = []
+        self.count = 0
+        self.generation = 0
+
+        self.condition = threading.Condition()
+
+    def reset(self):
+        ''' Empties the pool, if it was inherited from another process '''
+
+        process = os.getpid()
+        if self.process == process:
+            return
+
+        self.process = process
+        self.idle = []
+        self.busy = []
+        self.count = 0
+        atexit.register(self.close)
+
+    def acquire(self) -> any:
+        ''' Takes an instance from the process's pool, creating one if none
+        are free
+
+        Waits for one to be released if the pool's full. Factories which are
+        generators yield their instance, and tear it down after the yield
+        once the resource's closed
+
+        Returns
+        -------
+        value: any
+            the instance, which the caller has to release
+        '''
+
+        with self.condition:
+            self.reset()
+            while (not self.idle and
+                    self.size is not None and
+                    self.count >= self.size):
+                self.condition.wait()
+
+            if self.idle:
+                entry = self.idle.pop()
+                self.busy.append(entry)
+                return entry[0]
+
+            # Reserve a place, so the factory can run without the lock
+            self.count += 1
+            generation = self.generation
+
+        try:
+            value = self.factory()
+            generator = None
+            if isinstance(value, types.GeneratorType):
+                generator = value
+                value = next(generator)
+        except BaseException:
+            with self.condition:
+                self.count -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.busy.append([value, generator, generation])
+        return value
+
+    def release(self, value: any):
+        ''' Returns an instance to the pool
+
+        Instances acquired before the resource was closed are torn down
+        instead
+
+        Arguments
+        ---------
+        value: any
+            the instance, as acquired
+        '''
+
+        with self.condition:
+            entry = None
+            for index, candidate in enumerate(self.busy):
+                if candidate[0] is value:
+                    entry = self.busy.pop(index)
+                    break
+            if entry is None:
+                return
+
+            stale = entry[2] != self.generation
+            if stale:
+                self.count -= 1
+            else:
+                self.idle.append(entry)
+            self.condition.notify()
+
+        if stale:
+            self.teardown(entry)
+
+    def close(self):
+        ''' Tears down the process's idle instances, and those in use once
+        they're released
+
+        A later acquire creates new ones
+        '''
+
+        with self.condition:
+            if self.process != os.getpid():
+                return
+
+            entries = self.idle
+            self.idle = []
+            self.count -= len(entries)
+            self.generation += 1
+            self.condition.notify_all()
+
+        for entry in entries:
+            self.teardown(entry)
+
+    def teardown(self, entry: list):
+        ''' Finishes an instance's generator, if it has one
+
+        Arguments
+        ---------
+        entry: list
+            the instance's pool entry
+
+        Raises
+        ------
+        exception: Exception
+            if the generator yields again
+        '''
+
+        generator = entry[1]
+        if not generator:
+            return
+
+        try:
+            next(generator)
+        except StopIteration:
+            pass
+        else:
+            raise Exception(f"resource '{self.name}' yielded twice")
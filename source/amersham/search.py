@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import re
+
+from .plugin import Plugin
+from .storage import write as storage_write
+
+
+class Index:
+
+    # How much a term counts for, by where it appears
+    weights = {
+        "name": 3,
+        "flag": 2,
+        "description": 1,
+    }
+
+    def __init__(self, postings: dict):
+        self.postings = postings
+        self.terms = sorted(postings)
+
+    @staticmethod
+    def tokenize(text: str) -> list:
+        ''' Splits text into lowercase words
+
+        Arguments
+        ---------
+        text: str
+            the text
+
+        Returns
+        -------
+        tokens: list
+            the words, in order
+        '''
+
+        return re.findall(r"[a-z0-9]+", text.lower())
+
+    @staticmethod
+    def documents(commands: list) -> list:
+        ''' Collects the searchable text of each command
+
+        Plugins which haven't been loaded only contribute their name and
+        description, so searching never imports them
+
+        Arguments
+        ---------
+        commands: list
+            the commands, in order
+
+        Returns
+        -------
+        documents: list
+            a list of (field, text) pairs per command
+        '''
+
+        documents = []
+        for command in commands:
+            fields = [
+                ("name", command.name),
+                ("description", command.description),
+            ]
+            if not (isinstance(command, Plugin) and command.command is None):
+                for flag in command.flags:
+                    fields.append(("flag", flag.name))
+                    fields.append(("flag", flag.alias))
+                    fields.append(("description", flag.description))
+                for parameter in command.parameters:
+                    fields.append(("description", parameter.description))
+            documents.append(fields)
+        return documents
+
+    @staticmethod
+    def build(commands: list, path: str = "") -> Index:
+        ''' Builds an index over commands, or loads it from disk
+
+        Arguments
+        ---------
+        commands: list
+            the commands to index
+        path: str
+            where the index is cached; if empty, it isn't
+
+        Returns
+        -------
+        index: Index
+            the index, mapping each term to the commands it appears in
+        '''
+
+        documents = Index.documents(commands)
+
+        # Indexes are keyed by the text they cover
+        key = ""
+        if path:
+            text = json.dumps(documents, separators=(",", ":"))
+            key = hashlib.sha256(text.encode()).hexdigest()
+            try:
+                with open(path) as file:
+                    cached = json.load(file)
+                if cached["key"] == key:
+                    postings = {term: dict(entries)
+                            for term, entries in cached["postings"].items()}
+                    return Index(postings)
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        postings = {}
+        for position, fields in enumerate(documents):
+            for field, text in fields:
+                weight = Index.weights[field]
+                for term in Index.tokenize(text):
+                    entries = postings.setdefault(term, {})
+                    entries[position] = entries.get(position, 0) + weight
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                serialized = {term: list(entries.items())
+                        for term, entries in postings.items()}
+                storage_write(path, lambda file: json.dump(
+                        {"key": key, "postings": serialized}, file))
+            except OSError:
+                pass
+
+        return Index(postings)
+
+    def search(self, term: str, limit: int = None) -> tuple:
+        ''' Ranks the commands matching every word of a search term
+
+        Words also match terms they're a prefix of, at half weight
+
+        Arguments
+        ---------
+        term: str
+            the search term
+        limit: int
+            how many of the best matches to return; all of them, if None
+
+        Returns
+        -------
+        positions, count: tuple[list, int]
+            the positions of the best matching commands, best first (ties
+            keep registration order), and how many matched in all
+        '''
+
+        scores = None
+        for token in Index.tokenize(term):
+
+            # Score each command by its best match for the word
+            matches = {}
+            start = bisect.bisect_left(self.terms, token)
+            for index in range(start, len(self.terms)):
+                candidate = self.terms[index]
+                if not candidate.startswith(token):
+                    break
+                entries = self.postings[candidate]
+                if candidate == token:
+                    matches = dict(entries)
+                elif not matches:
+                    matches = {position: weight / 2 
+                            for position, weight in entries.items()}
+                else:
+                    for position, weight in entries.items():
+                        if weight / 2 > matches.get(position, 0):
+                            matches[position] = weight / 2
+
+            if scores is None:
+                scores = matches
+            else:
+                scores = {position: score + matches[position]
+                        for position, score in scores.items()
+                        if position in matches}
+            if not scores:
+                return ([], 0)
+
+        if not scores:
+            return ([], 0)
+        
+        # Sorting is stable, so equal scores stay in registration order
+        positions = sorted(scores)
+        positions.sort(key=scores.__getitem__, reverse=True)
+        return (positions[:limit], len(positions))
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import threading
+
+
+def write(path: str, dump: callable, binary: bool = False):
+    ''' Writes a file atomically, so concurrent readers never see it partial
+
+    The contents go to a temporary file beside the path, named after the
+    process and thread, which then replaces it
+
+    Arguments
+    ---------
+    path: str
+        the file to write
+    dump: callable
+        writes the contents, given the open temporary file
+    binary: bool
+        whether the file's opened in binary mode
+
+    Raises
+    ------
+    exception: Exception
+        whatever opening, dumping or replacing raised; the temporary file's
+        removed first
+    '''
+
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(temporary_path, "wb" if binary else "w") as file:
+            dump(file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def reason(error: OSError) -> str:
+    ''' Describes why an operating system call failed
+
+    Arguments
+    ---------
+    error: OSError
+        the failure
+
+    Returns
+    -------
+    reason: str
+        the error's lowercase description, for messages
+    '''
+
+    return error.strerror.lower() if error.strerror else "error"
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+import os
+import sys
+
+from .parse_exception import ParseException
+from .storage import reason as storage_reason
+
+
+class Stream:
+
+    def __init__(self,
+            binary: bool = False,
+            buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+            encoding: str = None):
+
+        if buffer_size < 1:
+            raise Exception(f"stream buffer size ({buffer_size}) invalid")
+
+        self.binary = binary
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+
+    def open(self, value: any) -> any:
+        ''' Opens a stream, from either a path or stdin
+
+        Reading happens lazily, a buffer at a time; iterating the result
+        yields lines without loading the whole input
+
+        Arguments
+        ---------
+        value: any
+            a path (as a string or bytes), or '-' for stdin
+
+        Returns
+        -------
+        stream: any
+            a buffered binary or text reader, to be closed by the caller
+
+        Raises
+        ------
+        exception: ParseException
+            if the path couldn't be opened
+        '''
+
+        mode = "rb" if self.binary else "r"
+        encoding = None if self.binary else self.encoding
+
+        # Wrap stdin's descriptor; closing the wrapper leaves stdin open
+        if value == "-" or value == b"-":
+            return open(sys.stdin.fileno(),
+                    mode,
+                    buffering=self.buffer_size,
+                    encoding=encoding,
+                    closefd=False)
+
+        try:
+            return open(value,
+                    mode,
+                    buffering=self.buffer_size,
+                    encoding=encoding)
+        except OSError as error:
+            reason = storage_reason(error)
+            path = os.fsdecode(value)
+            raise ParseException(f"can't open '{path}' ({reason})")
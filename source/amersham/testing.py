@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import io
+import shlex
+import sys
+import threading
+
+from .context import Context
+
+
+class Redirect:
+
+    def __init__(self, stream: any):
+        self.stream = stream
+        self.local = threading.local()
+
+    def target(self) -> any:
+        ''' Finds where the calling thread's writes go
+
+        Returns
+        -------
+        stream: any
+            the thread's buffer, if it's running a command, or the stream
+            which was replaced otherwise
+        '''
+
+        buffer = getattr(self.local, "buffer", None)
+        return buffer if buffer is not None else self.stream
+
+    def write(self, text: str) -> int:
+        ''' Writes text to the calling thread's target
+
+        Arguments
+        ---------
+        text: str
+            the text to write
+
+        Returns
+        -------
+        count: int
+            the number of characters written
+        '''
+
+        return self.target().write(text)
+
+    def flush(self):
+        ''' Flushes the calling thread's target '''
+
+        self.target().flush()
+
+    def __getattr__(self, name: str) -> any:
+
+        # Anything else goes to the target too
+        return getattr(self.target(), name)
+
+
+class Result:
+
+    def __init__(self,
+            code: int,
+            output: str,
+            errors: str,
+            exception: BaseException = None,
+            value: any = None):
+
+        self.code = code
+        self.output = output
+        self.errors = errors
+        self.exception = exception
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Result(code={self.code}, exception={self.exception!r})"
+
+
+class Runner:
+
+    # Redirection is shared by every runner; it's installed while any are
+    # running, and each thread's writes go to its own buffers
+    lock = threading.Lock()
+    users = 0
+    stdout = None
+    stderr = None
+
+    def __init__(self, parser: any):
+        self.parser = parser
+
+    @staticmethod
+    def install():
+        ''' Redirects stdout and stderr, if not already '''
+
+        with Runner.lock:
+            if not Runner.users:
+                Runner.stdout = Redirect(sys.stdout)
+                Runner.stderr = Redirect(sys.stderr)
+                sys.stdout = Runner.stdout
+                sys.stderr = Runner.stderr
+            Runner.users += 1
+
+    @staticmethod
+    def uninstall():
+        ''' Restores stdout and stderr, once no runners are left '''
+
+        with Runner.lock:
+            Runner.users -= 1
+            if Runner.users:
+                return
+
+            # Leave alone streams which have since been replaced again
+            if sys.stdout is Runner.stdout:
+                sys.stdout = Runner.stdout.stream
+            if sys.stderr is Runner.stderr:
+                sys.stderr = Runner.stderr.stream
+            Runner.stdout = None
+            Runner.stderr = None
+
+    def run(self, arguments: any) -> Result:
+        ''' Runs the parser in-process, capturing what it writes
+
+        User errors which would exit are caught, as are exceptions raised by
+        callbacks; the parser's configuration isn't changed
+
+        Arguments
+        ---------
+        arguments: any
+            the arguments (stripped of path directory), or a string to split
+            with shell rules
+
+        Returns
+        -------
+        result: Result
+            the exit code, what was written to stdout and stderr, and the
+            exception or callback's return value
+        '''
+
+        if isinstance(arguments, str):
+            arguments = shlex.split(arguments)
+
+        output = io.StringIO()
+        errors = io.StringIO()
+        context = Context(raise_exceptions=False, output=output)
+
+        code = 0
+        exception = None
+        value = None
+
+        Runner.install()
+        stdout = Runner.stdout
+        stderr = Runner.stderr
+        stdout.local.buffer = output
+        stderr.local.buffer = errors
+        try:
+            value = self.parser.run(arguments, context)
+        except SystemExit as error:
+            exception = error
+            code = error.code
+            if not isinstance(code, int):
+                if code is not None:
+                    errors.write(f"{code}\n")
+                code = int(code is not None)
+        except Exception as error:
+            exception = error
+            code = 1
+        finally:
+            stdout.local.buffer = None
+            stderr.local.buffer = None
+            Runner.uninstall()
+
+        return Result(code, output.getvalue(), errors.getvalue(), exception,
+                value)
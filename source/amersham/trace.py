@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+
+
+class Trace:
+
+    def __init__(self, redact: bool = True):
+        self.redact = redact
+
+        self.command = ""
+        self.flags = {}
+        self.spans = {
+            "lookup": 0.0,
+            "cast": 0.0,
+        }
+        self.parse = 0.0
+        self.callback = 0.0
+        self.exception = None
+        self.status = 0
+
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    def mark(self, span: str):
+        ''' Attributes the time since the last mark to a span
+
+        Arguments
+        ---------
+        span: str
+            the span's name; one of 'lookup' or 'cast'
+        '''
+
+        now = time.perf_counter()
+        self.spans[span] += now - self.last
+        self.last = now
+
+    def flag(self, name: str, value: any):
+        ''' Records a flag's presence
+
+        Arguments
+        ---------
+        name: str
+            the flag's name
+        value: any
+            the flag's raw value (a string or bytes), recorded unless
+            redacting
+        '''
+
+        if self.redact and value is not None:
+            value = "<redacted>"
+        elif isinstance(value, bytes):
+            value = os.fsdecode(value)
+        self.flags[name] = value
+
+    def begin_callback(self):
+        ''' Ends the parse span, as the callback's about to be called '''
+
+        now = time.perf_counter()
+        self.parse = now - self.start
+        self.last = now
+
+    def end_callback(self):
+        ''' Ends the callback span '''
+
+        self.callback = time.perf_counter() - self.last
+
+    def fail(self, error: BaseException):
+        ''' Records the exception an invocation ended with
+
+        Arguments
+        ---------
+        error: BaseException
+            the exception
+        '''
+
+        self.exception = type(error).__name__
+        if isinstance(error, SystemExit):
+            code = error.code
+            self.status = code if isinstance(code, int) else int(bool(code))
+        else:
+            self.status = 1
+
+    def serialize(self) -> str:
+        ''' Serializes the trace as a line of JSON
+
+        Returns
+        -------
+        line: str
+            the trace, newline-terminated
+        '''
+
+        # Parsing may not have finished if the invocation failed
+        if not self.parse:
+            self.parse = time.perf_counter() - self.start
+
+        record = {
+            "command": self.command,
+            "flags": self.flags,
+            "parse": self.parse,
+            "callback": self.callback,
+            "spans": self.spans,
+            "exception": self.exception,
+            "status": self.status,
+        }
+        import json
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class Tracer:
+
+    def __init__(self,
+            target: any,
+            redact: bool = True,
+            buffer_size: int = 1 << 16):
+
+        if isinstance(target, int):
+            self.file = open(target,
+                    "a",
+                    buffering=buffer_size,
+                    closefd=False)
+        else:
+            self.file = open(target, "a", buffering=buffer_size)
+
+        self.redact = redact
+        self.lock = threading.Lock()
+
+        atexit.register(self.close)
+
+    def start(self) -> Trace:
+        ''' Starts tracing an invocation
+
+        Returns
+        -------
+        trace: Trace
+            the invocation's trace, to be passed to the write method when done
+        '''
+
+        return Trace(self.redact)
+
+    def write(self, trace: Trace):
+        ''' Appends a finished trace to the buffer
+
+        Arguments
+        ---------
+        trace: Trace
+            the finished trace
+        '''
+
+        line = trace.serialize()
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(line)
+
+    def flush(self):
+        ''' Writes buffered traces to the target '''
+
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+
+    def close(self):
+        ''' Flushes and closes the target '''
+
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+        atexit.unregister(self.close)
@@ -1,4 +1,12 @@
+import enum
+import os
+import pathlib
+
 from .parse_exception import ParseException
+from .choice import Choice
+from .file import File
+from .stream import Stream
+from .unit import Size, Duration, Rate
 
 
 def serialize(type_name: type) -> str:
@@ -24,23 +32,57 @@ def serialize(type_name: type) -> str:
         str: "string",
         int: "integer",
         bool: "boolean",
+        list: "list",
+        dict: "mapping",
+        bytes: "bytes",
+        pathlib.Path: "path",
+        Size: "size",
+        Duration: "duration",
+        Rate: "rate",
         type(None): "",
     }
 
+    if isinstance(type_name, Stream):
+        return "stream"
+    elif isinstance(type_name, File):
+        return "file"
+    elif isinstance(type_name, Choice):
+        return type_name.serialize()
+
     if type_name not in values:
         raise Exception(f"type {type_name} unsupported")
     return values[type_name]
 
 
-def cast(value_type: type, value: str) -> any:
+def managed(value_type: type) -> bool:
+    ''' Checks whether a type's values are handles, which need closing
+    
+    Arguments
+    ---------
+    value_type: type
+        the type
+    
+    Returns
+    -------
+    managed: bool
+        if values cast to the type should be closed after use
+    '''
+
+    return isinstance(value_type, (Stream, File))
+
+
+def cast(value_type: type, value: any) -> any:
     ''' Casts a value to its relevant type, as desired by a command
     
+    Bytes values (from a bytes argv) reach bytes-typed arguments and opened
+    paths untouched; everything else decodes them as the filesystem would
+    
     Arguments
     ---------
     value_type: type
         the type wanted by the argument
-    value: str
-        the value to cast
+    value: any
+        the value to cast, as a string or bytes
     
     Returns
     -------
@@ -57,9 +99,25 @@ def cast(value_type: type, value: str) -> any:
     if value_type == type(None):
         return True
 
+    # Raw bytes, encoded if given a string
+    elif value_type == bytes:
+        return value if isinstance(value, bytes) else os.fsencode(value)
+
+    # Other types decode bytes, unless they're paths to be opened
+    if isinstance(value, bytes) and not managed(value_type):
+        value = os.fsdecode(value)
+
     # Handle strings
-    elif value_type == str:
+    if value_type == str:
         return value
+
+    # Paths; undecodable bytes are escaped, and restored by 'os.fsencode'
+    elif value_type == pathlib.Path:
+        return pathlib.Path(value)
+
+    # Sizes, durations and rates, with units
+    elif value_type in [Size, Duration, Rate]:
+        return value_type(value)
     
     # Booleans
     elif value_type == bool:
@@ -103,6 +161,159 @@ def cast(value_type: type, value: str) -> any:
                 raise ParseException(f"empty token in list '{value}'")
         return tokens
     
+    # Mappings of 'key=value' pairs
+    elif value_type == dict:
+        if value == "{}":
+            return {}
+        
+        mapping = {}
+        for token in value.split(","):
+            if "=" not in token:
+                raise ParseException(f"expects key=value, got '{token}'")
+            key, item = token.split("=", 1)
+            if not key:
+                raise ParseException(f"empty key in '{token}'")
+            mapping[key] = item
+        return mapping
+
+    # Choices
+    elif isinstance(value_type, Choice):
+        return value_type.cast(value)
+
+    # Streams and files, opened here and closed by the command once it's run
+    elif managed(value_type):
+        return value_type.open(value)
+
     # Other
     else:
-        raise Exception(f"unsupported type '{value_type}'")
\ No newline at end of file
+        raise Exception(f"unsupported type '{value_type}'")
+
+def coerce(value_type: type, value: any) -> any:
+    ''' Checks an already-typed value (as from JSON) against a type
+
+    Strings are cast as they would be from the command line, so errors read
+    the same
+    
+    Arguments
+    ---------
+    value_type: type
+        the type wanted by the argument
+    value: any
+        the value to check
+    
+    Returns
+    -------
+    value: any
+        the value, copied if mutable, or cast if it was a string; presence
+        flags give True or False
+    
+    Raises
+    ------
+    exception: ParseException
+        if the value's of the wrong type
+    '''
+
+    # Presence flags are switched on or off
+    if value_type == type(None):
+        if isinstance(value, bool):
+            return value
+        raise ParseException("expects no value")
+
+    elif isinstance(value, str):
+        return cast(value_type, value)
+
+    elif value_type == bool and isinstance(value, bool):
+        return value
+    elif (value_type == int and isinstance(value, int) and 
+            not isinstance(value, bool)):
+        return value
+    
+    # Sizes, durations and rates can be given as plain numbers
+    elif (value_type in [Size, Duration, Rate] and 
+            isinstance(value, (int, float)) and not isinstance(value, bool)):
+        if value_type != Size or float(value).is_integer():
+            return value_type(value)
+    elif value_type == pathlib.Path and isinstance(value, pathlib.PurePath):
+        return pathlib.Path(value)
+    elif value_type == bytes and isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    elif value_type == list and isinstance(value, list):
+        return list(value)
+    elif value_type == dict and isinstance(value, dict):
+        return dict(value)
+    
+    # Enumerations' choices can be given as the members themselves
+    elif (isinstance(value_type, Choice) and isinstance(value, enum.Enum) and
+            value_type.values.get(value.name.lower()) is value):
+        return value
+
+    # Integer choices are labelled by their values
+    elif (isinstance(value_type, Choice) and isinstance(value, int) and
+            not isinstance(value, bool)):
+        return value_type.cast(f"{value}")
+
+    import json
+    text = json.dumps(value, default=str)
+    raise ParseException(f"expects {serialize(value_type)}, got '{text}'")
+
+
+def cast_column(value_type: type, values: list) -> tuple:
+    ''' Casts a column of values to a type, at once
+
+    Integers are converted in bulk where every value's a valid string;
+    otherwise each distinct string's only cast once. Values which aren't
+    strings (as from a dataframe) are checked against the type instead
+    
+    Arguments
+    ---------
+    value_type: type
+        the type wanted by the argument
+    values: list
+        the values to cast
+    
+    Returns
+    -------
+    values, errors: tuple[list, dict]
+        the cast values (None where invalid), and error messages by index
+    
+    Raises
+    ------
+    exception: Exception
+        if the type's values are handles, which can't be cast in bulk
+    '''
+
+    if managed(value_type):
+        raise Exception(f"type {value_type} can't be cast in bulk")
+
+    if value_type == int and all(type(value) == str for value in values):
+        try:
+            return (list(map(int, values)), {})
+        except ValueError:
+            pass
+    
+    cast_values = []
+    errors = {}
+    distinct = {}
+    for index, value in enumerate(values):
+        if not isinstance(value, str):
+            try:
+                cast_value, error = coerce(value_type, value), None
+            except ParseException as exception:
+                cast_value, error = None, f"{exception}"
+        
+        elif value in distinct:
+            cast_value, error = distinct[value]
+        else:
+            try:
+                cast_value, error = cast(value_type, value), None
+            except ParseException as exception:
+                cast_value, error = None, f"{exception}"
+
+            # Mutable values can't be shared between rows
+            if not isinstance(cast_value, (list, dict)):
+                distinct[value] = (cast_value, error)
+        
+        if error:
+            errors[index] = error
+        cast_values.append(cast_value)
+    return (cast_values, errors)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import functools
+import re
+
+from .parse_exception import ParseException
+
+
+# Multipliers, by lowercase unit; decimal prefixes count in thousands, and
+# binary ones in 1024s
+sizes = {
+    "": 1,
+    "b": 1,
+    "k": 10 ** 3,
+    "kb": 10 ** 3,
+    "kib": 1 << 10,
+    "m": 10 ** 6,
+    "mb": 10 ** 6,
+    "mib": 1 << 20,
+    "g": 10 ** 9,
+    "gb": 10 ** 9,
+    "gib": 1 << 30,
+    "t": 10 ** 12,
+    "tb": 10 ** 12,
+    "tib": 1 << 40,
+    "p": 10 ** 15,
+    "pb": 10 ** 15,
+    "pib": 1 << 50,
+}
+
+# Nanoseconds, by unit; minutes are 'm', and months aren't supported
+second = 10 ** 9
+durations = {
+    "ns": 1,
+    "us": 10 ** 3,
+    "µs": 10 ** 3,
+    "ms": 10 ** 6,
+    "s": second,
+    "m": 60 * second,
+    "h": 60 * 60 * second,
+    "d": 24 * 60 * 60 * second,
+    "w": 7 * 24 * 60 * 60 * second,
+}
+
+# Counts, by suffix
+counts = {
+    "": 1,
+    "k": 10 ** 3,
+    "m": 10 ** 6,
+    "g": 10 ** 9,
+}
+
+# Grammars, compiled once
+number = r"(\d+(?:\.\d*)?|\.\d+)"
+unit = r"(ns|us|µs|ms|s|m|h|d|w)"
+number_pattern = re.compile(number)
+size_pattern = re.compile(rf"{number}\s*([a-z]*)")
+duration_pattern = re.compile(rf"{number}{unit}")
+rate_pattern = re.compile(rf"{number}\s*([kmg]?)/(\d*){unit}")
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_size(text: str) -> int:
+    ''' Parses a size, such as '64MiB' or '1.5k', to bytes
+
+    Arguments
+    ---------
+    text: str
+        the size; units are case-insensitive
+
+    Returns
+    -------
+    size: int
+        the number of bytes
+
+    Raises
+    ------
+    exception: ParseException
+        if the text isn't a whole number of bytes
+    '''
+
+    import fractions
+    match = size_pattern.fullmatch(text.strip().lower())
+    if not match or match.group(2) not in sizes:
+        raise ParseException(f"expects size, got '{text}'")
+
+    value = fractions.Fraction(match.group(1)) * sizes[match.group(2)]
+    if value.denominator != 1:
+        raise ParseException(f"expects size, got '{text}'")
+    return int(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_duration(text: str) -> float:
+    ''' Parses a duration, such as '1m30s' or '250ms', to seconds
+
+    A bare number's taken as seconds
+
+    Arguments
+    ---------
+    text: str
+        the duration
+
+    Returns
+    -------
+    duration: float
+        the number of seconds
+
+    Raises
+    ------
+    exception: ParseException
+        if the text isn't a duration
+    '''
+
+    import fractions
+    text = text.strip()
+    lowered = text.lower()
+    if number_pattern.fullmatch(lowered):
+        return float(fractions.Fraction(lowered))
+
+    # Components have to cover the whole text
+    total = 0
+    end = 0
+    for match in duration_pattern.finditer(lowered):
+        if match.start() != end:
+            break
+        total += fractions.Fraction(match.group(1)) * \
+                durations[match.group(2)]
+        end = match.end()
+    if not end or end != len(lowered):
+        raise ParseException(f"expects duration, got '{text}'")
+    return float(total / second)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_rate(text: str) -> float:
+    ''' Parses a rate, such as '10k/s' or '5/15m', to events per second
+
+    A bare number's taken as per second
+
+    Arguments
+    ---------
+    text: str
+        the rate
+
+    Returns
+    -------
+    rate: float
+        the number of events per second
+
+    Raises
+    ------
+    exception: ParseException
+        if the text isn't a rate
+    '''
+
+    import fractions
+    text = text.strip()
+    lowered = text.lower()
+    if "/" not in lowered:
+        lowered += "/s"
+
+    match = rate_pattern.fullmatch(lowered)
+    if not match:
+        raise ParseException(f"expects rate, got '{text}'")
+
+    count = fractions.Fraction(match.group(1)) * counts[match.group(2)]
+    period = int(match.group(3) or 1) * durations[match.group(4)]
+    if not period:
+        raise ParseException(f"expects rate, got '{text}'")
+    return float(count * second / period)
+
+
+class Size(int):
+
+    def __new__(cls, value: any = 0) -> Size:
+        if isinstance(value, str):
+            value = parse_size(value)
+        return super().__new__(cls, value)
+
+    def __repr__(self) -> str:
+        return f"Size({int(self)})"
+
+    def __str__(self) -> str:
+        return f"{int(self)}"
+
+
+class Duration(float):
+
+    def __new__(cls, value: any = 0.0) -> Duration:
+        if isinstance(value, str):
+            value = parse_duration(value)
+        return super().__new__(cls, value)
+
+    def __repr__(self) -> str:
+        return f"Duration({float(self)})"
+
+    def __str__(self) -> str:
+        return f"{float(self)}"
+
+
+class Rate(float):
+
+    def __new__(cls, value: any = 0.0) -> Rate:
+        if isinstance(value, str):
+            value = parse_rate(value)
+        return super().__new__(cls, value)
+
+    def __repr__(self) -> str:
+        return f"Rate({float(self)})"
+
+    def __str__(self) -> str:
+        return f"{float(self)}"
@@ -0,0 +1,64 @@
+import os
+import pathlib
+
+from amersham import Parser, ParseException, Stream
+
+
+def test_bytes(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def copy(source: bytes,
+            destination: pathlib.Path,
+            mode = b"",
+            retries = 0,
+            backup = pathlib.Path()):
+        return (source, destination, mode, retries, backup)
+    
+    @parser.command()
+    def read(stream: Stream):
+        return stream.read()
+    
+    # Undecodable names reach the callback as they were given
+    name = b"caf\xe9"
+    result = parser.run([b"copy",
+            b"--mode=r\xffw",
+            b"--retries=2",
+            b"--backup=" + name,
+            name,
+            name])
+    assert result[0] == name
+    assert isinstance(result[1], pathlib.Path)
+    assert os.fsencode(result[1]) == name
+    assert result[2] == b"r\xffw"
+    assert result[3] == 2
+    assert os.fsencode(result[4]) == name
+    
+    # Strings still work, encoded where bytes are wanted
+    result = parser.run(["copy", "--mode=rw", "a", "b"])
+    assert result[0] == b"a"
+    assert result[2] == b"rw"
+
+    # Paths are opened without decoding
+    path = os.fsencode(tmp_path) + b"/" + name
+    with open(path, "w") as file:
+        file.write("text")
+    assert parser.run([b"read", path]) == "text"
+
+    tests = {
+        (b"copy", b"--retries=x", b"a", b"b"):
+            "'--retries' expects integer, got 'x'",
+        (b"copy", b"--force", b"a", b"b"): "'--force' flag unexpected",
+        (b"copy", b"--mode=a=b", b"a", b"b"):
+            "'--mode' has multiple '=' instances",
+        (b"copy", b"a", b"b", b"c"): "unexpected parameter 'c'",
+        (b"read", b"missing"):
+            "'stream' can't open 'missing' (no such file or directory)",
+    }
+    for arguments, message in tests.items():
+        try:
+            parser.run(list(arguments))
+        except ParseException as error:
+            assert f"{error}" == message
+        else:
+            assert False
@@ -0,0 +1,115 @@
+import os
+import time
+
+from amersham import Parser, ParseException, Cache
+
+
+def test_cache():
+    parser = Parser("test", raise_exceptions=True)
+
+    calls = []
+
+    @parser.command(cache=Cache(size=2))
+    def command(parameter: int, flag = []):
+        calls.append(parameter)
+        return parameter * 2
+
+    # Repeated calls hit the cache, even with flags re-ordered
+    assert parser.run(["1"]) == 2
+    assert parser.run(["1"]) == 2
+    assert parser.run(["--flag=a,b", "1"]) == 2
+    assert parser.run(["--flag=a,b", "1"]) == 2
+    assert calls == [1, 1]
+
+    # Bypass
+    assert parser.run(["--no-cache", "1"]) == 2
+    assert calls == [1, 1, 1]
+
+    # Least recently used evicted
+    parser.run(["2"])
+    parser.run(["3"])
+    parser.run(["1"])
+    assert calls == [1, 1, 1, 2, 3, 1]
+
+    # Bypass takes no value
+    try:
+        parser.run(["--no-cache=yes", "1"])
+    except ParseException as error:
+        assert f"{error}" == "'--no-cache' expects no value"
+    else:
+        assert False
+
+
+def test_cache_copies():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(cache=True)
+    def command(parameter: int):
+        return {"values": [parameter]}
+
+    # Changing a result changes neither the cached one, nor later hits
+    result = parser.run(["1"])
+    result["values"].append(2)
+    hit = parser.run(["1"])
+    assert hit == {"values": [1]}
+    hit["values"].clear()
+    assert parser.run(["1"]) == {"values": [1]}
+
+
+def test_cache_ttl(monkeypatch):
+    parser = Parser("test", raise_exceptions=True)
+
+    calls = []
+
+    @parser.command(cache=Cache(ttl=10))
+    def command():
+        calls.append(None)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    parser.run([])
+    parser.run([])
+    assert len(calls) == 1
+
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    parser.run([])
+    assert len(calls) == 2
+
+
+def test_cache_disk(tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_text("text")
+
+    calls = []
+
+    def command(path = ""):
+        calls.append(path)
+        return len(calls)
+
+    # Entries persist between parsers (processes, in practice)
+    for _ in range(2):
+        parser = Parser("test", raise_exceptions=True)
+        cache = Cache(path=f"{tmp_path / 'cache'}", mtime=["path"])
+        parser.command(cache=cache)(command)
+        assert parser.run([f"--path={path}"]) == 1
+
+    # File modification invalidates the entry
+    os.utime(path, ns=(0, 0))
+    assert parser.run([f"--path={path}"]) == 2
+
+
+def test_cache_help():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(cache=True)
+    def command():
+        pass
+
+    help_message = \
+"""usage
+  test [--help] [--no-cache]
+
+flags
+  --help      -h  displays this message
+  --no-cache      bypasses the result cache"""
+    assert parser.help() == help_message
@@ -0,0 +1,139 @@
+import enum
+
+from amersham import Parser, ParseException
+
+
+class Colour(enum.Enum):
+    RED = 0
+    GREEN = 1
+    BLUE = 2
+
+
+def test_choice():
+    parser = Parser("test", raise_exceptions=True)
+
+    regions = [f"region-{index}" for index in range(5000)]
+    overrides = {
+        "region": {
+            "choices": regions,
+        },
+        "size": {
+            "choices": [1, 2, 4],
+        },
+    }
+    @parser.command(**overrides)
+    def command(region: str, size = 1, colour = Colour.RED):
+        return (region, size, colour)
+    
+    assert parser.run(["region-42"]) == ("region-42", 1, Colour.RED)
+    result = parser.run(["--size=4", "--colour=Blue", "region-0"])
+    assert result == ("region-0", 4, Colour.BLUE)
+
+    # Near misses suggested
+    try:
+        parser.run(["regoin-4242"])
+    except ParseException as error:
+        message = "'region' expects one of {region-0, region-1, region-2, " \
+                "region-3, region-4, region-5, region-6, region-7, ...}, " \
+                "got 'regoin-4242'; did you mean 'region-4242'?"
+        assert f"{error}" == message
+    else:
+        assert False
+    
+    try:
+        parser.run(["--size=3", "region-0"])
+    except ParseException as error:
+        assert f"{error}" == "'--size' expects one of {1, 2, 4}, got '3'"
+    else:
+        assert False
+    
+    # Choices only for strings and integers
+    try:
+        @parser.command(name="other-command", flag={"choices": [True]})
+        def command(flag = False):
+            pass
+    except Exception as error:
+        message = "choices of type (<class 'bool'>) not supported"
+        assert f"{error}" == message
+    else:
+        assert False
+
+
+def test_choice_enum():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(colour: Colour):
+        return colour
+    
+    assert parser.run(["green"]) == Colour.GREEN
+
+    help_message = \
+"""usage
+  test [--help] COLOUR
+
+flags
+  --help  -h  displays this message
+
+parameters
+  COLOUR  {red, green, blue}"""
+    assert parser.help() == help_message
+
+
+def test_choice_complete():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(colour: Colour, *shades: Colour, background = Colour.RED):
+        pass
+    
+    @parser.command()
+    def other_command():
+        pass
+    
+    assert parser.complete("command --background=b", "--background=b") == [
+        "--background=blue",
+    ]
+    assert parser.complete("command r", "r") == ["red"]
+    assert parser.complete("command red blue g", "g") == ["green"]
+    assert parser.complete("command ", "") == [
+        "blue", 
+        "green", 
+        "red", 
+        "--help", 
+        "--background=",
+    ]
+
+
+def test_choice_case():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(region={"choices": ["EU-West", "us"]})
+    def command(region = "us"):
+        return region
+    
+    # Labels match in any case, and give back the value listed
+    assert parser.run(["--region=EU-West"]) == "EU-West"
+    assert parser.run(["--region=eu-west"]) == "EU-West"
+    assert parser.run(["--region=US"]) == "us"
+    assert parser.complete("--region=E", "--region=E") == [
+        "--region=eu-west",
+    ]
+
+    try:
+        parser.run(["--region=eu-wset"])
+    except ParseException as error:
+        message = "'--region' expects one of {eu-west, us}, got 'eu-wset'; " \
+                "did you mean 'eu-west'?"
+        assert f"{error}" == message
+    else:
+        assert False
+
+    try:
+        @parser.command(name="other", region={"choices": ["us", "US"]})
+        def command(region = "us"):
+            pass
+    except Exception as error:
+        assert f"{error}" == "choice 'us' listed more than once"
+    else:
+        assert False
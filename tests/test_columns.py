@@ -0,0 +1,107 @@
+import enum
+import os
+
+from amersham import Parser, ParseException
+
+
+class Colour(enum.Enum):
+    RED = 1
+    GREEN = 2
+
+
+def test_columns(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def paint(name: str, colour: Colour, coats = 1, glossy = None):
+        return (name, colour, coats, glossy)
+
+    @parser.command(columnar=True)
+    def total(name: str, coats = 1):
+        return (name, sum(coats))
+
+    command = parser.get_command("paint")
+    results = command.run_columns({
+        "name": ["door", "wall", "fence"],
+        "colour": ["red", "green", "red"],
+        "coats": ["2", "", "3"],
+        "glossy": ["yes", "no", ""],
+    })
+    assert results == [
+        ("door", Colour.RED, 2, True),
+        ("wall", Colour.GREEN, 1, False),
+        ("fence", Colour.RED, 3, False),
+    ]
+
+    # Switches are off when unset or missing, as from the command line
+    assert parser.run(["paint", "door", "red"]) == \
+            ("door", Colour.RED, 1, False)
+
+    # Whole columns, for callbacks which take them
+    results = parser.get_command("total").run_columns({
+        "name": ["door", "wall"],
+        "coats": ["2", "3"],
+    })
+    assert results == [(["door", "wall"], 5)]
+
+    # From a CSV file, in chunks
+    path = os.path.join(tmp_path, "table.csv")
+    with open(path, "w") as file:
+        file.write("name,colour,coats\n")
+        for index in range(10):
+            file.write(f"item-{index},green,{index}\n")
+    results = command.run_columns(path, chunk_size=3)
+    assert len(results) == 10
+    assert results[9] == ("item-9", Colour.GREEN, 9, False)
+
+    # Every invalid cell's reported, by row
+    with open(path, "a") as file:
+        file.write("item-10,blue,1\n")
+        file.write("item-11,red,x\n")
+    tests = [
+        (path, "row 11: 'colour' expects one of {red, green}, got 'blue'\n"
+                "row 12: '--coats' expects integer, got 'x'"),
+        ({"name": ["a"]}, "expected column 'colour'"),
+        ({"name": ["a"], "colour": ["red"], "size": ["1"]},
+                "unexpected column 'size'"),
+        ({"name": ["a"], "colour": []}, "columns differ in length"),
+    ]
+    for table, message in tests:
+        try:
+            command.run_columns(table, chunk_size=100)
+        except ParseException as error:
+            assert f"{error}" == message
+        else:
+            assert False
+
+
+def test_columns_native():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def paint(name: str, colour: Colour, coats = 1, glossy = None, 
+            strict = False):
+        return (name, colour, coats, glossy, strict)
+
+    # Typed cells, as from a dataframe, are checked rather than parsed
+    command = parser.get_command("paint")
+    results = command.run_columns({
+        "name": ["door", "wall"],
+        "colour": [Colour.RED, "green"],
+        "coats": [2, None],
+        "glossy": [True, False],
+        "strict": [True, "false"],
+    })
+    assert results == [
+        ("door", Colour.RED, 2, True, True),
+        ("wall", Colour.GREEN, 1, False, False),
+    ]
+
+    # Including whether they're whole numbers
+    try:
+        command.run_columns({"name": ["door"], "colour": ["red"], 
+                "coats": [1.7]})
+    except ParseException as error:
+        assert f"{error}" == "row 1: '--coats' expects integer, got '1.7'"
+    else:
+        assert False
@@ -0,0 +1,99 @@
+from amersham import Parser, ParseException
+
+
+def test_constraints():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(exclusive=[["json", "yaml", "csv"]],
+            require_one=[["source", "url"]],
+            depends={"force": ["yes"]})
+    def export(source = "", url = "", json = None, yaml = None, csv = None,
+            force = None, yes = None):
+        return (source, url, json, yaml, csv, force, yes)
+
+    @parser.command()
+    def other(value = ""):
+        return value
+
+    result = parser.run(["export", "--url=x", "--json", "--force", "--yes"])
+    assert result == ("", "x", True, False, False, True, True)
+
+    try:
+        parser.run(["export", "--source=x", "--json", "--csv"])
+    except ParseException as error:
+        assert f"{error}" == "'--json', '--csv' mutually exclusive"
+    else:
+        assert False
+
+    try:
+        parser.run(["export", "--yaml"])
+    except ParseException as error:
+        assert f"{error}" == "expected one of '--source', '--url'"
+    else:
+        assert False
+
+    # Every broken constraint's reported
+    try:
+        parser.run(["export", "--json", "--yaml", "--force"])
+    except ParseException as error:
+        assert f"{error}" == "\n".join([
+            "'--json', '--yaml' mutually exclusive",
+            "expected one of '--source', '--url'",
+            "'--force' requires '--yes'",
+        ])
+    else:
+        assert False
+
+    # Typed arguments are checked the same way; false switches are absent
+    result = parser.run_json({"command": "export",
+            "flags": {"url": "x", "json": True, "yaml": False}})
+    assert result == ("", "x", True, False, False, False, False)
+
+    try:
+        parser.run_json({"command": "export",
+                "flags": {"url": "x", "force": True}})
+    except ParseException as error:
+        assert f"{error}" == "'--force' requires '--yes'"
+    else:
+        assert False
+
+    # Rows of a table, too
+    command = parser.get_command("export")
+    try:
+        command.run_columns({
+            "url": ["a", "", "c"],
+            "json": ["yes", "", "no"],
+            "csv": ["yes", "", "yes"],
+        })
+    except ParseException as error:
+        assert f"{error}" == "\n".join([
+            "row 1: '--json', '--csv' mutually exclusive",
+            "row 2: expected one of '--source', '--url'",
+        ])
+    else:
+        assert False
+
+    help = command.help()
+    assert help.endswith("\n\nconstraints\n"
+            "  '--json', '--yaml', '--csv' mutually exclusive\n"
+            "  one of '--source', '--url' required\n"
+            "  '--force' requires '--yes'")
+    assert "constraints" not in parser.get_command("other").help()
+
+    # Constraints are checked when registered
+    try:
+        parser.command(exclusive=[["missing", "json"]])(
+                lambda missing, json = None: None)
+    except Exception as error:
+        assert f"{error}" == "constrained flag 'missing' not registered " \
+                "in '<lambda>'"
+    else:
+        assert False
+
+    try:
+        parser.command(name="single", exclusive=[["json"]])(
+                lambda json = None: None)
+    except Exception as error:
+        assert f"{error}" == "exclusive group needs at least two flags"
+    else:
+        assert False
@@ -0,0 +1,103 @@
+import io
+import threading
+
+from amersham import Parser, ParseException, Context
+
+
+def test_context():
+    parser = Parser("test")
+
+    @parser.command()
+    def command(parameter: int):
+        return parameter
+    
+    # Per-call error handling, without touching the parser's configuration
+    try:
+        parser.run(["one"], Context(raise_exceptions=True))
+    except ParseException as error:
+        assert f"{error}" == "'parameter' expects integer, got 'one'"
+    else:
+        assert False
+    assert not parser.raise_exceptions
+    
+    # Per-call output
+    output = io.StringIO()
+    try:
+        parser.run(["one"], Context(output=output))
+    except SystemExit as exit:
+        assert exit.code == 1
+    else:
+        assert False
+    assert output.getvalue() == """usage
+  test command [--help] PARAMETER
+'parameter' expects integer, got 'one'
+"""
+
+    output = io.StringIO()
+    parser.run(["--help"], Context(output=output))
+    assert output.getvalue().startswith("usage\n")
+
+
+def test_context_freeze():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(flag = None):
+        return flag
+    
+    parser.freeze()
+
+    # Configuration fixed
+    try:
+        @parser.command()
+        def other_command():
+            pass
+    except Exception as error:
+        assert f"{error}" == "'test' frozen"
+    else:
+        assert False
+    
+    # Indexed lookup
+    assert parser.get_command("command").get_flag("flag", False)
+    assert parser.run(["--flag"]) == True
+
+
+def test_context_threads():
+    parser = Parser("test")
+
+    @parser.command()
+    def command(parameter: int, flag = None):
+        return (parameter, flag)
+    
+    @parser.command()
+    def other_command(parameter: int):
+        return parameter
+
+    parser.freeze()
+
+    failures = []
+
+    def run(index: int):
+        for iteration in range(200):
+            if iteration % 2:
+                result = parser.run(["command", "--flag", f"{index}"])
+                if result != (index, True):
+                    failures.append(result)
+                continue
+
+            output = io.StringIO()
+            try:
+                parser.run(["other-command", "x"], Context(output=output))
+            except SystemExit:
+                if not output.getvalue().endswith("got 'x'\n"):
+                    failures.append(output.getvalue())
+            else:
+                failures.append(None)
+
+    threads = [threading.Thread(target=run, args=(index,)) 
+            for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures
@@ -0,0 +1,109 @@
+import enum
+import pathlib
+
+from amersham import Parser, ParseException, Size
+
+
+class Colour(enum.Enum):
+    RED = 0
+    GREEN = 1
+
+
+def test_default_factory():
+    parser = Parser("test", raise_exceptions=True)
+    calls = []
+
+    def detect_jobs():
+        calls.append("jobs")
+        return 4
+
+    @parser.command(jobs={"default_factory": detect_jobs, "type": int},
+            buffer={"default_factory": lambda: "64KiB", "type": Size},
+            tags={"default_factory": lambda: ["a"], "type": list})
+    def build(target: str, jobs = None, buffer = None, tags = None):
+        tags.append(target)
+        return (target, jobs, buffer, tags)
+
+    @parser.command()
+    def other(value = ""):
+        return value
+
+    # Evaluated only when absent, and only once
+    assert parser.run(["build", "--jobs=2", "x"]) == ("x", 2, 65536,
+            ["a", "x"])
+    assert calls == []
+    assert parser.run(["build", "x"]) == ("x", 4, 65536, ["a", "x"])
+    assert parser.run(["build", "y"]) == ("y", 4, 65536, ["a", "y"])
+    assert calls == ["jobs"]
+
+    # Given values are still checked against the declared type
+    try:
+        parser.run(["build", "--jobs=many", "x"])
+    except ParseException as error:
+        assert f"{error}" == "'--jobs' expects integer, got 'many'"
+    else:
+        assert False
+
+    result = parser.run_json({"command": "build", "parameters": ["z"]})
+    assert result == ("z", 4, 65536, ["a", "z"])
+
+    results = parser.get_command("build").run_columns({
+        "target": ["p", "q"],
+        "jobs": ["", "8"],
+    })
+    assert [result[1] for result in results] == [4, 8]
+    assert calls == ["jobs"]
+
+    # Help shows a placeholder, rather than calling the factory
+    calls.clear()
+    help = parser.get_command("build").help()
+    assert "(default <detect_jobs>)" in help
+    assert "(default <computed>)" in help
+    assert calls == []
+
+
+def test_default_factory_types(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(where={"default_factory": lambda: tmp_path, 
+                "type": pathlib.Path},
+            magic={"default_factory": lambda: b"\x89PNG", "type": bytes},
+            colour={"default_factory": lambda: Colour.GREEN, "type": Colour})
+    def command(where = None, magic = None, colour = None):
+        return (where, magic, colour)
+
+    # Native values are checked against the declared type
+    assert parser.run([]) == (tmp_path, b"\x89PNG", Colour.GREEN)
+    assert parser.run(["--colour=red"])[2] == Colour.RED
+
+
+def test_default_factory_errors():
+    parser = Parser("test", raise_exceptions=True)
+
+    tests = [
+        ({"default_factory": lambda: 1}, 
+                "'--jobs' default factory without type"),
+        ({"type": int}, "'--jobs' type without default factory"),
+        ({"default_factory": lambda: 1, "type": type(None)}, 
+                "'--jobs' type (<class 'NoneType'>) not supported"),
+    ]
+    for overrides, message in tests:
+        try:
+            parser.command(jobs=overrides)(lambda jobs = None: None)
+        except Exception as error:
+            assert f"{error}" == message
+        else:
+            assert False
+
+    @parser.command(jobs={"default_factory": lambda: "many", "type": int})
+    def build(jobs = None):
+        return jobs
+
+    try:
+        parser.run([])
+    except Exception as error:
+        message = "'--jobs' default factory's value expects integer, " \
+                "got 'many'"
+        assert f"{error}" == message
+    else:
+        assert False
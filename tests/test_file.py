@@ -0,0 +1,95 @@
+import mmap
+
+from amersham import Parser, ParseException, File
+
+
+def test_file(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    handles = []
+
+    @parser.command()
+    def command(source: File, config = File("binary")):
+        handles.append(source)
+        if config:
+            handles.append(config)
+            return (source.read(), config.read())
+        return source.read()
+
+    path = tmp_path / "input.txt"
+    path.write_text("text")
+
+    # Text parameter
+    assert parser.run([f"{path}"]) == "text"
+
+    # Binary flag, both closed afterwards
+    assert parser.run([f"--config={path}", f"{path}"]) == ("text", b"text")
+    assert all(handle.closed for handle in handles)
+
+    # Missing path
+    missing = tmp_path / "missing.txt"
+    try:
+        parser.run([f"{missing}"])
+    except ParseException as error:
+        message = f"'source' can't open '{missing}' (no such file or directory)"
+        assert f"{error}" == message
+    else:
+        assert False
+
+    # Directory
+    try:
+        parser.run([f"--config={tmp_path}", f"{path}"])
+    except ParseException as error:
+        assert f"{error}" == f"'--config' can't open '{tmp_path}' (is a directory)"
+    else:
+        assert False
+    
+    # Configuration error
+    try:
+        File("write")
+    except Exception as error:
+        assert f"{error}" == "file mode 'write' invalid"
+    else:
+        assert False
+
+
+def test_file_mmap(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    handles = []
+
+    @parser.command()
+    def command(source: File("mmap")):
+        handles.append(source)
+        with memoryview(source) as view:
+            return bytes(view[1:3])
+
+    path = tmp_path / "input.bin"
+    path.write_bytes(b"\x00\x01\x02\x03")
+
+    assert parser.run([f"{path}"]) == b"\x01\x02"
+    assert isinstance(handles[0], mmap.mmap) and handles[0].closed
+
+    # Empty files can't be mapped
+    path.write_bytes(b"")
+    assert parser.run([f"{path}"]) == b""
+
+
+def test_file_help():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(source: File, config = File()):
+        pass
+
+    help_message = \
+"""usage
+  test [--help] [--config=] SOURCE
+
+flags
+  --help    -h        displays this message
+  --config      file
+
+parameters
+  SOURCE  file"""
+    assert parser.help() == help_message
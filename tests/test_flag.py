@@ -59,13 +59,21 @@ def test_flag():
         assert False
 
     # Invalid flags
-    for flag in ["--", "-"]:
-        try:
-            parser.run([flag])
-        except ParseException as error:
-            assert f"{error}" == f"'{flag}' flag invalid"
-        else:
-            assert False
+    try:
+        parser.run(["-"])
+    except ParseException as error:
+        assert f"{error}" == "'-' flag invalid"
+    else:
+        assert False
+
+    # A lone '--' ends the flags
+    assert parser.run(["--"]) is False
+    try:
+        parser.run(["--", "--flag"])
+    except ParseException as error:
+        assert f"{error}" == "unexpected parameter '--flag'"
+    else:
+        assert False
 
     # Badly formatted value
     try:
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+from amersham import Parser, ParseException
+
+
+def test_graph(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+    source = os.path.join(tmp_path, "source.txt")
+    built = os.path.join(tmp_path, "built.txt")
+    state = os.path.join(tmp_path, "state.json")
+    events = []
+
+    with open(source, "w") as file:
+        file.write("one")
+
+    @parser.command(inputs=[source], outputs=[built])
+    def build(suffix = ""):
+        events.append("build")
+        with open(source) as input, open(built, "w") as output:
+            output.write(input.read() + suffix)
+
+    @parser.command(requires=["build"], inputs=[built])
+    def check():
+        events.append("check")
+
+    @parser.command(requires=["build"])
+    def package():
+        events.append("package")
+
+    @parser.command(requires=["check", "package"])
+    def release():
+        events.append("release")
+
+    statuses = parser.run_graph(["release"], jobs=2, state=state)
+    assert events[0] == "build" and events[-1] == "release"
+    assert sorted(events[1:3]) == ["check", "package"]
+    assert set(statuses.values()) == {"ran"}
+
+    # Nothing changed, so nothing runs
+    events.clear()
+    statuses = parser.run_graph(["release"], jobs=2, state=state)
+    assert events == []
+    assert list(statuses) == ["build", "check", "package", "release"]
+    assert set(statuses.values()) == {"skipped"}
+
+    # Changing an input reruns its command, and everything after it
+    with open(source, "w") as file:
+        file.write("two")
+    parser.run_graph(["check"], state=state)
+    assert events == ["build", "check"]
+
+    # As do changed arguments, and missing outputs
+    events.clear()
+    parser.run_graph(["check"], arguments={"build": ["--suffix=!"]},
+            state=state)
+    assert events == ["build", "check"]
+
+    events.clear()
+    os.remove(built)
+    parser.run_graph(["build"], arguments={"build": ["--suffix=!"]},
+            state=state)
+    assert events == ["build"]
+
+
+def test_graph_concurrency(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+    barrier = threading.Barrier(2, timeout=5)
+
+    @parser.command()
+    def left():
+        barrier.wait()
+
+    @parser.command()
+    def right():
+        barrier.wait()
+
+    @parser.command(requires=["left", "right"])
+    def both():
+        pass
+
+    # Both sides have to run at once to pass the barrier
+    statuses = parser.run_graph(["both"], jobs=2, state="")
+    assert statuses["both"] == "ran"
+
+
+def test_graph_errors(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+    state = os.path.join(tmp_path, "state.json")
+    events = []
+
+    @parser.command(requires=["cycle-b"])
+    def cycle_a():
+        pass
+
+    @parser.command(requires=["cycle-a"])
+    def cycle_b():
+        pass
+
+    @parser.command(requires=["missing"])
+    def orphan():
+        pass
+
+    @parser.command()
+    def fail(value: int):
+        raise ValueError("failed")
+
+    @parser.command()
+    def slow():
+        time.sleep(0.05)
+        events.append("slow")
+
+    @parser.command(requires=["fail", "slow"])
+    def after():
+        events.append("after")
+
+    tests = {
+        "cycle-a": "dependency cycle cycle-a -> cycle-b -> cycle-a",
+        "orphan": "'orphan' requires unregistered command 'missing'",
+        "nothing": "unrecognized command 'nothing'",
+    }
+    for target, message in tests.items():
+        try:
+            parser.run_graph([target], state=state)
+        except Exception as error:
+            assert f"{error}" == message
+        else:
+            assert False
+
+    # Argument errors surface as usual
+    try:
+        parser.run_graph(["fail"], arguments={"fail": ["x"]}, state=state)
+    except ParseException as error:
+        assert f"{error}" == "'value' expects integer, got 'x'"
+    else:
+        assert False
+
+    # Running commands finish, but nothing new starts
+    try:
+        parser.run_graph(["after"], jobs=2,
+                arguments={"fail": ["1"]},
+                state=state)
+    except ValueError:
+        pass
+    else:
+        assert False
+    assert events == ["slow"]
+
+    # Only the successful command's recorded
+    events.clear()
+    parser.run_graph(["slow"], state=state)
+    assert events == []
@@ -38,10 +38,10 @@ commands
   command-2  another command"""
     assert parser.help() == help_message
 
-    # Trailing garbage after "--help"
+    # Trailing garbage after "--help" and a search term, and page
     for help_string in ["--help", "-h"]:
         try:
-            arguments = [help_string, "garbage"]
+            arguments = [help_string, "term", "1", "garbage"]
             parser.run(arguments)
         except ParseException as error:
             assert f"{error}" == f"'{help_string}' followed by other arguments"
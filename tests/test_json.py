@@ -0,0 +1,81 @@
+import json
+import os
+
+from amersham import Parser, ParseException
+
+
+def test_run_json(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(verbose={"alias": "v", "count": True})
+    def copy(source: str,
+            count: int,
+            force = None,
+            retries = 0,
+            tags = [],
+            verbose = 0):
+        return (source, count, force, retries, tags, verbose)
+
+    @parser.command()
+    def add(*values: int):
+        return sum(values)
+
+    payload = {
+        "command": "copy",
+        "flags": {"force": True, "retries": 3, "tags": ["a"], "verbose": 2},
+        "parameters": ["in", 4],
+    }
+    assert parser.run_json(payload) == ("in", 4, True, 3, ["a"], 2)
+    assert parser.run_json(json.dumps(payload)) == ("in", 4, True, 3, ["a"], 2)
+
+    # Strings are cast like the command line's
+    payload = {"command": "copy", "flags": {"retries": "5", "force": None},
+            "parameters": ["in", "4"]}
+    assert parser.run_json(payload) == ("in", 4, False, 5, [], 0)
+
+    assert parser.run_json({"command": "add", "parameters": [1, 2, 3]}) == 6
+
+    # From the command line, inline or in a file
+    path = os.path.join(tmp_path, "payload.json")
+    with open(path, "w") as file:
+        json.dump({"command": "add", "parameters": [4, 5]}, file)
+    assert parser.run([f"--args-json=@{path}"]) == 9
+    assert parser.run(['--args-json={"command": "add"}']) == 0
+
+    # Errors match the command line's
+    tests = {
+        '{"command": "copy", "parameters": ["in", "x"]}':
+            "'count' expects integer, got 'x'",
+        '{"command": "copy", "parameters": ["in", true]}':
+            "'count' expects integer, got 'true'",
+        '{"command": "copy", "flags": {"tags": 1}, "parameters": ["a", 1]}':
+            "'--tags' expects list, got '1'",
+        '{"command": "copy", "flags": {"force": 1}, "parameters": ["a", 1]}':
+            "'--force' expects no value",
+        '{"command": "copy", "flags": {"size": 1}, "parameters": ["a", 1]}':
+            "'--size' flag unexpected",
+        '{"command": "copy", "parameters": ["in"]}': "expected 'count'",
+        '{"command": "copy", "parameters": ["in", 1, 2]}':
+            "unexpected parameter '2'",
+        '{"command": "move"}': "unrecognized command 'move'",
+        '{"command": "add", "extra": 1}': "'--args-json' key 'extra' unexpected",
+        '[1]': "'--args-json' expects an object",
+        '{': "'--args-json' invalid (expecting property name enclosed in "
+                "double quotes)",
+    }
+    for payload, message in tests.items():
+        try:
+            parser.run([f"--args-json={payload}"])
+        except ParseException as error:
+            assert f"{error}" == message
+        else:
+            assert False
+
+    try:
+        parser.run(["--args-json=@missing.json"])
+    except ParseException as error:
+        message = "'--args-json' can't open 'missing.json' " \
+                "(no such file or directory)"
+        assert f"{error}" == message
+    else:
+        assert False
@@ -0,0 +1,99 @@
+import io
+
+from amersham import Parser, ParseException, Context
+
+
+def test_output(capsys):
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(output="jsonl")
+    def command(count: int):
+        for index in range(count):
+            yield {"index": index, "name": f"row\t{index}"}
+    
+    @parser.command()
+    def other_command():
+        return iter([0])
+
+    # Streamed, rather than returned
+    assert parser.run(["command", "2"]) is None
+    assert capsys.readouterr().out == \
+"""{"index": 0, "name": "row\\t0"}
+{"index": 1, "name": "row\\t1"}
+"""
+
+    assert parser.run(["command", "--format=tsv", "2"]) is None
+    assert capsys.readouterr().out == \
+"""index\tname
+0\trow\\t0
+1\trow\\t1
+"""
+
+    # Returned when not streaming
+    assert list(parser.run(["other-command"])) == [0]
+
+    try:
+        parser.run(["command", "--format=xml", "1"])
+    except ParseException as error:
+        message = "'--format' expects one of jsonl, tsv, table, got 'xml'"
+        assert f"{error}" == message
+    else:
+        assert False
+
+
+def test_output_table():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(output="table")
+    def command():
+        yield ("a", 1, "x")
+        yield ("bbb", 22, "y")
+        yield ("cccccc", 333, "z")
+    
+    output = io.StringIO()
+    parser.run([], Context(raise_exceptions=True, output=output))
+    assert output.getvalue() == \
+"""a       1    x
+bbb     22   y
+cccccc  333  z
+"""
+
+
+def test_output_broken_pipe():
+    parser = Parser("test", raise_exceptions=True)
+
+    closed = []
+
+    @parser.command(output="jsonl")
+    def command():
+        try:
+            for index in range(1000000):
+                yield index
+        finally:
+            closed.append(True)
+    
+    class Pipe(io.StringIO):
+        def write(self, text: str):
+            raise BrokenPipeError()
+    
+    assert parser.run([], Context(output=Pipe())) is None
+    assert closed == [True]
+
+
+def test_output_parse_result(capsys):
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(output="jsonl", cache=True)
+    def command(count: int):
+        for index in range(count):
+            yield {"index": index}
+    
+    # Parse results stream the same way, and drop the format flag
+    result = parser.parse(["--format=tsv", "2"])
+    assert result.invoke() is None
+    assert capsys.readouterr().out == "index\n0\n1\n"
+
+    # Iterators aren't cached, since replaying one would print nothing
+    for _ in range(2):
+        assert parser.run(["1"]) is None
+        assert capsys.readouterr().out == '{"index": 0}\n'
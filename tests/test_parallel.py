@@ -0,0 +1,61 @@
+from amersham import Parser, ParseException, Parallel
+
+
+parser = Parser("test", raise_exceptions=True)
+
+@parser.command(parallel=Parallel("values", reducer=sum, executor="process"))
+def total(*values: int):
+    return sum(values)
+
+
+def test_parallel():
+    parser = Parser("test", raise_exceptions=True)
+
+    chunks = []
+
+    parallel = Parallel("values", reducer=lambda results: sum(results, []))
+    @parser.command(parallel=parallel)
+    def command(values = [], flag = None):
+        chunks.append(values)
+        return [value.upper() for value in values]
+    
+    # Single job
+    assert parser.run(["--flag", "--values=a,b,c"]) == ["A", "B", "C"]
+    assert chunks == [["a", "b", "c"]]
+
+    # Several, results kept in order
+    chunks.clear()
+    result = parser.run(["--jobs=2", "--values=a,b,c,d,e"])
+    assert result == ["A", "B", "C", "D", "E"]
+    assert sorted(chunks) == [["a", "b", "c"], ["d", "e"]]
+
+    # Absent list flags split their defaults
+    chunks.clear()
+    assert parser.run([]) == []
+    assert parser.run(["--jobs=2"]) == []
+    assert chunks == [[], []]
+
+    # Bad job count
+    try:
+        parser.run(["--jobs=0"])
+    except ParseException as error:
+        assert f"{error}" == "'--jobs' expects a positive integer, got 0"
+    else:
+        assert False
+    
+    # Only lists and variadics split
+    try:
+        @parser.command(parallel=Parallel("value"))
+        def other_command(value = ""):
+            pass
+    except Exception as error:
+        message = "'value' can't be split; expected a list or variadic argument"
+        assert f"{error}" == message
+    else:
+        assert False
+
+
+def test_parallel_process():
+    arguments = [f"{value}" for value in range(100)]
+    assert parser.run(["--jobs=4"] + arguments) == sum(range(100))
+    assert parser.run(["--jobs=4"]) == 0
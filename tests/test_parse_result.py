@@ -0,0 +1,99 @@
+import pickle
+
+from amersham import Parser, ParseException, File
+
+
+parser = Parser("test", raise_exceptions=True)
+
+@parser.command()
+def command(parameter: int, flag = []):
+    return (parameter, flag)
+
+@parser.command()
+def other_command(source: File):
+    return source.read()
+
+@parser.command()
+def sum_command(*values: int):
+    return sum(values)
+
+
+def test_parse_result():
+
+    result = parser.parse(["command", "--flag=a,b", "1"])
+    assert result.name == "command"
+    assert result.kwargs == {"parameter": 1, "flag": ["a", "b"]}
+    assert result.invoke() == (1, ["a", "b"])
+
+    # Immutable
+    try:
+        result.command = None
+    except AttributeError as error:
+        assert f"{error}" == "parse results are immutable"
+    else:
+        assert False
+    
+    # Errors reported while parsing
+    try:
+        parser.parse(["command", "one"])
+    except ParseException as error:
+        assert f"{error}" == "'parameter' expects integer, got 'one'"
+    else:
+        assert False
+
+    # Help printed, nothing to run
+    assert parser.parse(["--help"]) is None
+    assert parser.parse(["command", "--help"]) is None
+
+
+def test_parse_result_pickle(tmp_path):
+
+    result = parser.parse(["command", "--flag=a", "1"])
+    data = pickle.dumps(result)
+    assert pickle.loads(data) == result
+    assert pickle.loads(data).invoke() == (1, ["a"])
+
+    # Sends an identifier, not the callback
+    assert b"command" in data and b"callback" not in data
+
+    # Open files stay put
+    path = tmp_path / "input.txt"
+    path.write_text("text")
+    result = parser.parse(["other-command", f"{path}"])
+    try:
+        pickle.dumps(result)
+    except TypeError as error:
+        message = "'other-command' parse result holds open files"
+        assert f"{error}" == message
+    else:
+        assert False
+    
+    assert result.invoke() == "text"
+    assert result.handles[0].closed
+
+    # Variadic values are kept as given until invoked
+    result = parser.parse(["sum-command", "1", "2"])
+    assert pickle.loads(pickle.dumps(result)).invoke() == 3
+
+
+def alpha(value = ""):
+    return value
+
+
+def test_parse_result_parsers():
+    first = Parser("first", raise_exceptions=True)
+    second = Parser("second", raise_exceptions=True)
+    first.command(value={"alias": "v"})(alpha)
+    second.command(name="beta")(alpha)
+
+    # The same function, registered with two parsers, stays distinct
+    for parser, name in [(first, "alpha"), (second, "beta")]:
+        result = pickle.loads(pickle.dumps(parser.parse(["--value=x"])))
+        assert result.command is parser.get_command(name)
+        assert result.invoke() == "x"
+
+    # Parsers built again replace their commands
+    rebuilt = Parser("first", raise_exceptions=True)
+    rebuilt.command()(alpha)
+    result = pickle.loads(pickle.dumps(first.parse(["--value=x"])))
+    assert result.command is rebuilt.get_command("alpha")
@@ -0,0 +1,51 @@
+from amersham import Parser, ParseException
+
+
+def test_pipeline(capsys):
+    parser = Parser("test", raise_exceptions=True)
+    called = []
+
+    # Not a generator function, so calls are recorded as they're made
+    @parser.command(output="jsonl")
+    def numbers(count: int):
+        called.append(count)
+        return ({"index": index} for index in range(count))
+
+    @parser.command(output="jsonl", pipe="rows")
+    def double(rows: list, offset = 0):
+        for row in rows:
+            yield {"index": row["index"] * 2 + offset}
+
+    @parser.command(pipe="rows")
+    def total(rows: list):
+        return sum(row["index"] for row in rows)
+
+    assert parser.run(["numbers", "3", "++", "double", "++", "total"]) == 6
+    assert parser.run(
+            ["numbers", "2", "++", "double", "--offset=1", "++", "total"]) == 4
+
+    # The last stage's iterator is streamed
+    assert parser.run(["numbers", "2", "++", "double"]) is None
+    assert capsys.readouterr().out == "{\"index\": 0}\n{\"index\": 2}\n"
+
+    assert called == [3, 2, 2]
+
+    # Every stage is parsed before any runs
+    called.clear()
+    tests = {
+        ("numbers", "1", "++", "numbers", "1"):
+            "'numbers' doesn't accept piped input",
+        ("numbers", "1", "++", "double", "--offset=x"):
+            "'--offset' expects integer, got 'x'",
+        ("numbers", "1", "++"): "empty pipeline stage",
+        ("numbers", "1", "++", "total", "extra"):
+            "unexpected parameter 'extra'",
+    }
+    for arguments, message in tests.items():
+        try:
+            parser.run(list(arguments))
+        except ParseException as error:
+            assert f"{error}" == message
+        else:
+            assert False
+    assert not called
@@ -0,0 +1,83 @@
+import json
+import sys
+
+from amersham import Parser
+
+
+def install(path):
+    ''' Installs a fake distribution, with two commands '''
+
+    (path / "fake_plugin.py").write_text('''
+from amersham import Command
+
+def greet(name: str, loud = None):
+    """ greets someone """
+    return f"hello {name}" + ("!" if loud else "")
+
+def _farewell(name: str):
+    return f"goodbye {name}"
+
+farewell = Command.construct(_farewell, "", description="says goodbye")
+''')
+
+    metadata = path / "fake_plugin-1.0.dist-info"
+    metadata.mkdir()
+    (metadata / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: fake-plugin\nVersion: 1.0\n")
+    (metadata / "entry_points.txt").write_text(
+            "[test.commands]\n"
+            "greet = fake_plugin:greet\n"
+            "farewell = fake_plugin:farewell\n")
+
+
+def test_plugin(tmp_path, monkeypatch):
+    environment = tmp_path / "environment"
+    environment.mkdir()
+    install(environment)
+    monkeypatch.syspath_prepend(f"{environment}")
+    index = tmp_path / "cache" / "index.json"
+
+    # Index built, importing plugins once
+    parser = Parser("test", raise_exceptions=True)
+    names = parser.discover("test.commands", index=f"{index}")
+    assert sorted(names) == ["farewell", "greet"]
+
+    entries = json.loads(index.read_text())["commands"]
+    descriptions = {entry["name"]: entry["description"] for entry in entries}
+    assert descriptions == {
+        "greet": "greets someone", 
+        "farewell": "says goodbye",
+    }
+    assert {entry["distribution"] for entry in entries} == {"fake-plugin"}
+    
+    # Later, the index is read and nothing's imported until run
+    del sys.modules["fake_plugin"]
+    parser = Parser("test", raise_exceptions=True)
+    parser.discover("test.commands", index=f"{index}")
+    assert "fake_plugin" not in sys.modules
+
+    help_message = parser.help()
+    assert "greet     greets someone" in help_message
+    assert "fake_plugin" not in sys.modules
+
+    assert parser.run(["greet", "--loud", "world"]) == "hello world!"
+    assert parser.run(["farewell", "world"]) == "goodbye world"
+    assert "fake_plugin" in sys.modules
+    del sys.modules["fake_plugin"]
+
+
+def test_plugin_fingerprint(tmp_path, monkeypatch):
+    from amersham.plugin import fingerprint
+
+    environment = tmp_path / "environment"
+    environment.mkdir()
+    monkeypatch.syspath_prepend(f"{environment}")
+    monkeypatch.chdir(environment)
+    key = fingerprint("test.commands")
+
+    # Ordinary files on the path, like the working directory's, don't count
+    (environment / "notes.txt").write_text("unrelated")
+    assert fingerprint("test.commands") == key
+
+    install(environment)
+    assert fingerprint("test.commands") != key
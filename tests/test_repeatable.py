@@ -0,0 +1,103 @@
+from amersham import Parser, ParseException
+
+
+def test_repeatable():
+    parser = Parser("test", raise_exceptions=True)
+
+    overrides = {
+        "tag": {
+            "repeatable": True,
+        },
+        "setting": {
+            "name": "set",
+            "repeatable": True,
+        },
+    }
+    @parser.command(**overrides)
+    def command(tag = [], setting = {}):
+        return (tag, setting)
+    
+    arguments = [f"--tag=tag-{index}" for index in range(10000)]
+    tags, _ = parser.run(arguments)
+    assert tags == [f"tag-{index}" for index in range(10000)]
+    
+    arguments = ["--tag=a,b", "--set=x=0", "--set=y=1=2,z=3", "--tag=c"]
+    result = parser.run(arguments)
+    assert result == (["a", "b", "c"], {"x": "0", "y": "1=2", "z": "3"})
+
+    # Bad pairs
+    try:
+        parser.run(["--set=x"])
+    except ParseException as error:
+        assert f"{error}" == "'--set' expects key=value, got 'x'"
+    else:
+        assert False
+    
+    # Only lists and dicts repeat
+    try:
+        @parser.command(name="other-command", flag={"repeatable": True})
+        def command(flag = ""):
+            pass
+    except Exception as error:
+        assert f"{error}" == "repeatable '--flag' not a list or dict"
+    else:
+        assert False
+
+
+def test_repeatable_mapping():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(flag = {}):
+        return flag
+    
+    assert parser.run(["--flag={}"]) == {}
+    assert parser.run(["--flag=a=0,b=1"]) == {"a": "0", "b": "1"}
+
+    try:
+        parser.run(["--flag=a=0", "--flag=b=1"])
+    except ParseException as error:
+        assert f"{error}" == "'--flag' defined more than once"
+    else:
+        assert False
+
+
+def test_count():
+    parser = Parser("test", raise_exceptions=True)
+
+    overrides = {
+        "verbose": {
+            "alias": "v",
+            "count": True,
+        },
+    }
+    @parser.command(**overrides)
+    def command(verbose = 0):
+        return verbose
+    
+    assert parser.run([]) == 0
+    assert parser.run(["-v"]) == 1
+    assert parser.run(["-vvv", "--verbose"]) == 4
+
+    try:
+        parser.run(["--verbose=2"])
+    except ParseException as error:
+        assert f"{error}" == "'--verbose' expects no value"
+    else:
+        assert False
+    
+    try:
+        parser.run(["-vvx"])
+    except ParseException as error:
+        assert f"{error}" == "'-vvx' flag unexpected"
+    else:
+        assert False
+
+    help_message = \
+"""usage
+  test [--help] [--verbose]...
+
+flags
+  --help     -h         displays this message
+  --verbose  -v  count"""
+    assert parser.help() == help_message
@@ -0,0 +1,111 @@
+import threading
+
+from amersham import Parser, ParseException, Parallel
+
+
+def test_resource():
+    parser = Parser("test", raise_exceptions=True)
+    events = []
+
+    @parser.resource("database")
+    def connect():
+        events.append("open")
+        yield {"rows": [1, 2, 3]}
+        events.append("close")
+
+    @parser.resource("session")
+    def session():
+        events.append("session")
+        return object()
+
+    @parser.command()
+    def count(table: str, database = None, verbose = None):
+        return (table, len(database["rows"]))
+
+    @parser.command(parallel=Parallel("values"))
+    def total(values: list, *, database, session):
+        return len(values) + len(database["rows"])
+
+    # Created once, then reused by later runs
+    assert parser.run(["count", "users"]) == ("users", 3)
+    assert parser.run(["count", "groups"]) == ("groups", 3)
+    assert events == ["open"]
+    assert parser.run(["total", "1,2"]) == [5]
+    assert events == ["open", "session"]
+
+    # Hidden from help and usage, and can't be passed
+    help_message = parser.get_command("count").help()
+    assert "database" not in help_message
+    try:
+        parser.run(["count", "--database=x", "users"])
+    except ParseException as error:
+        assert f"{error}" == "'--database' flag unexpected"
+    else:
+        assert False
+
+    # Closing tears generators down; the next run starts afresh
+    parser.close()
+    assert events == ["open", "session", "close"]
+    parser.run(["count", "users"])
+    assert events[-1] == "open"
+    parser.close()
+
+    # Arguments before a '*' variadic have to be passed by position
+    try:
+        @parser.command()
+        def broken(database, *values):
+            pass
+    except Exception as error:
+        message = "resource 'database' not keyword-only, but callback " \
+                "takes '*' variadics"
+        assert f"{error}" == message
+    else:
+        assert False
+
+
+def test_resource_pool():
+    parser = Parser("test", raise_exceptions=True)
+    created = []
+
+    @parser.resource("connection")
+    def connect():
+        created.append(object())
+        return created[-1]
+
+    @parser.resource("lock", size=1)
+    def lock():
+        return object()
+
+    barrier = threading.Barrier(2)
+    holding = []
+
+    @parser.command(parallel=Parallel("values"))
+    def work(values: list, *, connection):
+        barrier.wait(timeout=5)
+        return connection
+
+    @parser.command(parallel=Parallel("values"))
+    def exclusive(values: list, *, lock):
+        holding.append(lock)
+        assert len(holding) == 1
+        holding.pop()
+        return lock
+
+    # Concurrent calls never share an instance, and idle ones are reused
+    first, second = parser.run(["work", "--jobs=2", "1,2"])
+    assert first is not second
+    assert len(created) == 2
+    assert set(parser.run(["work", "--jobs=2", "1,2"])) == {first, second}
+    assert len(created) == 2
+
+    # Pools can be limited, so calls wait for an instance
+    results = parser.run(["exclusive", "--jobs=4", "1,2,3,4"])
+    assert len({id(result) for result in results}) == 1
+    parser.close()
+
+    try:
+        parser.resource("other", size=0)
+    except Exception as error:
+        assert f"{error}" == "resource 'other' size (0) invalid"
+    else:
+        assert False
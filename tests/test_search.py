@@ -0,0 +1,93 @@
+import os
+
+from amersham import Parser, ParseException
+
+
+def build(search_cache: str = "") -> Parser:
+    parser = Parser("test", raise_exceptions=True, search_cache=search_cache)
+
+    @parser.command(description="copies files between directories")
+    def copy(source: str, destination: str):
+        pass
+
+    @parser.command(description="removes files", recursive={"alias": "r"})
+    def remove(path: str, recursive = None):
+        pass
+
+    @parser.command(description="lists a directory, or copies its names")
+    def list_directory(path: str, copy = None):
+        pass
+
+    for index in range(100):
+        @parser.command(name=f"generated-{index}",
+                description=f"generated command number {index}")
+        def generated():
+            pass
+    
+    return parser
+
+
+def test_search(tmp_path, capsys):
+    parser = build()
+
+    # Names outrank flags, which outrank descriptions
+    names = [command.name for command in parser.search("copy")]
+    assert names == ["copy", "list-directory"]
+
+    names = [command.name for command in parser.search("director")]
+    assert names == ["list-directory", "copy"]
+
+    # Every word has to match
+    names = [command.name for command in parser.search("files remove")]
+    assert names == ["remove"]
+    assert parser.search("files missing") == []
+    assert parser.search("") == []
+
+    # Paging
+    first = parser.search("generated", size=30)
+    second = parser.search("generated", page=2, size=30)
+    assert len(first) == 30 and len(second) == 30
+    assert first[0].name == "generated-0"
+    assert second[0].name == "generated-30"
+    assert parser.search("generated", page=5, size=30) == []
+
+    # The index is rebuilt when commands are added
+    @parser.command(description="copies a file somewhere else")
+    def duplicate():
+        pass
+    names = [command.name for command in parser.search("copies")]
+    assert names == ["copy", "list-directory", "duplicate"]
+
+    # Searching from the command line
+    parser.run(["--help", "copy"])
+    assert capsys.readouterr().out == \
+"""commands matching 'copy' (1-2 of 2)
+  copy            copies files between directories
+  list-directory  lists a directory, or copies its names
+"""
+    parser.run(["--help", "generated", "11"])
+    assert capsys.readouterr().out == \
+"commands matching 'generated' (none on page 11)\n"
+    parser.run(["--help", "nothing"])
+    assert capsys.readouterr().out == "no commands match 'nothing'\n"
+
+    try:
+        parser.run(["--help", "copy", "0"])
+    except ParseException as error:
+        message = "'--help' page expects a positive integer, got '0'"
+        assert f"{error}" == message
+    else:
+        assert False
+
+
+def test_search_cache(tmp_path):
+    path = os.path.join(tmp_path, "index.json")
+    parser = build(path)
+    assert [command.name for command in parser.search("remove")] == ["remove"]
+    assert os.path.exists(path)
+
+    # Loaded from disk by another parser with the same commands
+    modified = os.stat(path).st_mtime_ns
+    parser = build(path)
+    assert [command.name for command in parser.search("-r")] == ["remove"]
+    assert os.stat(path).st_mtime_ns == modified
@@ -0,0 +1,60 @@
+import builtins
+
+from amersham import Parser
+
+
+def test_shell(monkeypatch, capsys):
+    parser = Parser("test")
+
+    @parser.command()
+    def add(left: int, right: int):
+        return left + right
+    
+    @parser.command()
+    def fail(flag = None):
+        raise ValueError("failed")
+
+    lines = iter([
+        "add 1 2",
+        "",
+        "add 1 'two'",
+        "fail",
+        "add 'unterminated",
+        "exit",
+        "add 3 4",
+    ])
+    monkeypatch.setattr(builtins, "input", lambda prompt: next(lines))
+    parser.shell()
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[0] == "3"
+    assert output[2] == "'right' expects integer, got 'two'"
+    assert output[4] == "ValueError: failed"
+    assert output[6] == "no closing quotation"
+    assert len(output) == 7
+    
+    # Error handling restored afterwards
+    assert not parser.raise_exceptions
+    assert not parser.get_command("add").raise_exceptions
+
+
+def test_shell_complete():
+    parser = Parser("test")
+
+    @parser.command()
+    def command(flag = None, other_flag = ""):
+        pass
+    
+    @parser.command()
+    def other_command():
+        pass
+    
+    assert parser.complete("", "") == [
+        "command", 
+        "other-command", 
+        "--help", 
+        "exit",
+    ]
+    assert parser.complete("oth", "oth") == ["other-command"]
+    assert parser.complete("command --o", "--o") == ["--other-flag="]
+    assert parser.complete("bad-command ", "") == []
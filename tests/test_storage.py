@@ -0,0 +1,44 @@
+import json
+import threading
+
+from amersham.storage import write, reason
+
+
+def test_storage(tmp_path):
+    path = tmp_path / "state.json"
+
+    # Threads in one process write through their own temporary files
+    def dump(index):
+        for _ in range(20):
+            write(f"{path}", lambda file: json.dump({"index": index}, file))
+
+    threads = [threading.Thread(target=dump, args=(index,))
+            for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert json.loads(path.read_text())["index"] in range(4)
+    assert [entry.name for entry in tmp_path.iterdir()] == ["state.json"]
+
+    # Failed writes leave the file as it was, and nothing behind
+    def fail(file):
+        file.write("partial")
+        raise ValueError("unserializable")
+
+    try:
+        write(f"{path}", fail)
+    except ValueError as error:
+        assert f"{error}" == "unserializable"
+    else:
+        assert False
+    assert json.loads(path.read_text())["index"] in range(4)
+    assert [entry.name for entry in tmp_path.iterdir()] == ["state.json"]
+
+    try:
+        open(tmp_path / "missing")
+    except OSError as error:
+        assert reason(error) == "no such file or directory"
+    else:
+        assert False
+    assert reason(OSError()) == "error"
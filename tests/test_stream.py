@@ -0,0 +1,77 @@
+import os
+import sys
+
+from amersham import Parser, ParseException, Stream
+
+
+def test_stream(tmp_path):
+    parser = Parser("test", raise_exceptions=True)
+
+    handles = []
+
+    @parser.command()
+    def command(source: Stream):
+        handles.append(source)
+        return list(source)
+
+    path = tmp_path / "input.txt"
+    path.write_text("line0\nline1\n")
+
+    # Lines read from a path, closed afterwards
+    assert parser.run([f"{path}"]) == ["line0\n", "line1\n"]
+    assert handles[-1].closed
+
+    # Missing path
+    try:
+        parser.run([f"{tmp_path / 'missing.txt'}"])
+    except ParseException as error:
+        message = f"'source' can't open '{tmp_path / 'missing.txt'}' " \
+                "(no such file or directory)"
+        assert f"{error}" == message
+    else:
+        assert False
+
+
+def test_stream_stdin(monkeypatch):
+    parser = Parser("test", raise_exceptions=True)
+
+    overrides = {
+        "source": {
+            "description": "input, or '-' for stdin",
+        },
+    }
+    @parser.command(**overrides)
+    def command(source: Stream(binary=True, buffer_size=4), flag = None):
+        return (list(source), flag)
+
+    reader, writer = os.pipe()
+    os.write(writer, b"line0\nline1\n")
+    os.close(writer)
+
+    stdin = os.fdopen(reader)
+    monkeypatch.setattr(sys, "stdin", stdin)
+
+    # Lone '-' reads stdin, which stays open
+    assert parser.run(["--flag", "-"]) == ([b"line0\n", b"line1\n"], True)
+    assert not stdin.closed
+    stdin.close()
+
+
+def test_stream_help():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(source: Stream):
+        pass
+
+    help_message = \
+"""usage
+  test [--help] SOURCE
+
+flags
+  --help  -h  displays this message
+
+parameters
+  SOURCE  stream"""
+    assert parser.help() == help_message
+
@@ -0,0 +1,81 @@
+import sys
+import threading
+
+from amersham import Parser
+from amersham.testing import Runner
+
+
+def test_runner():
+    parser = Parser("test")
+
+    @parser.command(output="jsonl")
+    def rows(count: int):
+        print("starting")
+        return iter(range(count))
+
+    @parser.command()
+    def warn(message: str):
+        print(message, file=sys.stderr)
+        return message
+
+    @parser.command()
+    def crash():
+        raise ValueError("crashed")
+
+    @parser.command()
+    def leave(code: int):
+        sys.exit(code)
+
+    runner = Runner(parser)
+
+    result = runner.run(["rows", "2"])
+    assert result.code == 0
+    assert result.output == "starting\n0\n1\n"
+    assert result.value is None
+
+    result = runner.run("warn 'hello there'")
+    assert (result.code, result.output, result.errors, result.value) == \
+            (0, "", "hello there\n", "hello there")
+
+    # Failures which would exit are caught, without reconfiguring the parser
+    result = runner.run(["rows", "x"])
+    assert result.code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert result.output.endswith("'count' expects integer, got 'x'\n")
+    assert not parser.raise_exceptions
+
+    result = runner.run(["crash"])
+    assert result.code == 1
+    assert isinstance(result.exception, ValueError)
+
+    assert runner.run(["leave", "3"]).code == 3
+
+    # Streams are restored afterwards
+    assert sys.stdout.__class__.__name__ != "Redirect"
+
+
+def test_runner_threads():
+    parser = Parser("test")
+
+    @parser.command()
+    def echo(value: int):
+        for _ in range(100):
+            print(value)
+        return value
+
+    runner = Runner(parser)
+    results = {}
+
+    def run(value: int):
+        results[value] = runner.run([f"{value}"])
+
+    threads = [threading.Thread(target=run, args=(value,))
+            for value in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every thread only sees its own output
+    for value, result in results.items():
+        assert result.output == f"{value}\n" * 100
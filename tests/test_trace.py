@@ -0,0 +1,73 @@
+import json
+import os
+
+from amersham import Parser, ParseException, Tracer
+
+
+def test_trace(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(f"{path}")
+    parser = Parser("test", raise_exceptions=True, tracer=tracer)
+
+    @parser.command()
+    def command(parameter: int, flag = None, value = ""):
+        return parameter
+    
+    @parser.command()
+    def other_command():
+        raise ValueError()
+    
+    assert parser.run(["command", "--flag", "--value=secret", "1"]) == 1
+    for arguments in [["command", "one"], ["other-command"], ["bad-command"]]:
+        try:
+            parser.run(arguments)
+        except (ParseException, ValueError):
+            pass
+        else:
+            assert False
+
+    # Buffered until flushed
+    tracer.flush()
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 4
+
+    record = records[0]
+    assert record["command"] == "command"
+    assert record["flags"] == {"flag": None, "value": "<redacted>"}
+    assert record["exception"] is None and record["status"] == 0
+    assert record["parse"] > 0 and record["callback"] > 0
+    assert sorted(record["spans"]) == ["cast", "lookup"]
+    
+    exceptions = [record["exception"] for record in records[1:]]
+    assert exceptions == ["ParseException", "ValueError", "ParseException"]
+    assert [record["status"] for record in records[1:]] == [1, 1, 1]
+    assert records[3]["command"] == ""
+
+    tracer.close()
+
+
+def test_trace_descriptor():
+    reader, writer = os.pipe()
+    tracer = Tracer(writer, redact=False)
+    parser = Parser("test", tracer=tracer)
+
+    @parser.command()
+    def command(value = ""):
+        pass
+    
+    # Exits are recorded with their status
+    try:
+        parser.run(["--bad-flag"])
+    except SystemExit:
+        pass
+    else:
+        assert False
+    parser.run(["--value=visible"])
+    tracer.close()
+    os.close(writer)
+
+    with os.fdopen(reader) as file:
+        records = [json.loads(line) for line in file]
+    assert records[0]["exception"] == "SystemExit"
+    assert records[0]["status"] == 1
+    assert records[1]["flags"] == {"value": "visible"}
@@ -0,0 +1,80 @@
+from amersham import Parser, ParseException, Size, Duration, Rate
+
+
+def test_units():
+    tests = {
+        "64MiB": 64 << 20,
+        "1.5k": 1500,
+        "4 KB": 4000,
+        "512": 512,
+        "2GiB": 2 << 30,
+    }
+    for text, value in tests.items():
+        assert Size(text) == value
+
+    tests = {
+        "1m30s": 90.0,
+        "250ms": 0.25,
+        "1.5h": 5400.0,
+        "2d": 172800.0,
+        "10": 10.0,
+        "1M": 60.0,
+        "1H": 3600.0,
+        "30S": 30.0,
+        "250MS": 0.25,
+    }
+    for text, value in tests.items():
+        assert Duration(text) == value
+
+    tests = {
+        "10k/s": 10000.0,
+        "120/m": 2.0,
+        "5/10s": 0.5,
+        "3": 3.0,
+    }
+    for text, value in tests.items():
+        assert Rate(text) == value
+
+    for unit, text in [(Size, "1.5B"), (Duration, "1m 30s"), (Rate, "1/0s")]:
+        try:
+            unit(text)
+        except ParseException as error:
+            name = unit.__name__.lower()
+            assert f"{error}" == f"expects {name}, got '{text}'"
+        else:
+            assert False
+
+
+def test_unit_arguments():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def tune(limit: Rate,
+            buffer = Size("64MiB"),
+            timeout = Duration("30s")):
+        return (limit, buffer, timeout)
+
+    assert parser.run(["100/s"]) == (100.0, 64 << 20, 30.0)
+    limit, buffer, timeout = parser.run(
+            ["--buffer=1KiB", "--timeout=1m30s", "10k/m"])
+    assert (buffer, timeout) == (1024, 90.0)
+    assert isinstance(buffer, Size) and isinstance(limit, Rate)
+    assert str(buffer) == "1024"
+
+    assert parser.help() == """usage
+  test [--help] [--buffer=] [--timeout=] LIMIT
+
+flags
+  --help     -h            displays this message
+  --buffer       size
+  --timeout      duration
+
+parameters
+  LIMIT  rate"""
+
+    try:
+        parser.run(["--buffer=lots", "1/s"])
+    except ParseException as error:
+        assert f"{error}" == "'--buffer' expects size, got 'lots'"
+    else:
+        assert False
@@ -0,0 +1,134 @@
+from amersham import Parser, ParseException
+
+
+def test_variadic():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(destination, *sources: int, flag = None):
+        return (destination, sources, flag)
+    
+    assert parser.run(["out"]) == ("out", (), False)
+    assert parser.run(["--flag", "out", "0", "1"]) == ("out", (0, 1), True)
+
+    # Values cast individually
+    try:
+        parser.run(["out", "0", "one"])
+    except ParseException as error:
+        assert f"{error}" == "'sources' expects integer, got 'one'"
+    else:
+        assert False
+    
+    # Nothing follows a variadic
+    try:
+        @parser.command(name="other-command")
+        def command(*sources, destination):
+            pass
+    except Exception as error:
+        assert f"{error}" == "'destination' follows variadic 'sources'"
+    else:
+        assert False
+
+
+def test_variadic_stream():
+    parser = Parser("test", raise_exceptions=True)
+
+    overrides = {
+        "paths": {
+            "variadic": True,
+            "minimum": 1,
+            "maximum": 3,
+        },
+    }
+    @parser.command(**overrides)
+    def command(paths):
+        assert not isinstance(paths, (list, tuple))
+        return list(paths)
+    
+    assert parser.run(["a", "b"]) == ["a", "b"]
+
+    # Arity
+    try:
+        parser.run([])
+    except ParseException as error:
+        assert f"{error}" == "'paths' expects at least 1 values, got 0"
+    else:
+        assert False
+
+    try:
+        parser.run(["a", "b", "c", "d"])
+    except ParseException as error:
+        assert f"{error}" == "'paths' expects at most 3 values, got 4"
+    else:
+        assert False
+    
+    # Every value's checked before the callback runs
+    values = []
+
+    @parser.command(name="other-command", numbers={"variadic": True})
+    def command(numbers: int):
+        for number in numbers:
+            values.append(number)
+    
+    try:
+        parser.run(["other-command", "0", "1", "two", "3"])
+    except ParseException as error:
+        assert f"{error}" == "'numbers' expects integer, got 'two'"
+    else:
+        assert False
+    assert values == []
+
+    try:
+        parser.parse(["other-command", "0", "two"])
+    except ParseException as error:
+        assert f"{error}" == "'numbers' expects integer, got 'two'"
+    else:
+        assert False
+    result = parser.parse(["other-command", "0", "--", "1"])
+    assert result.kwargs == {"numbers": (0, 1)}
+
+
+def test_variadic_usage():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command(paths={"minimum": 1, "description": "some paths"})
+    def command(*paths):
+        pass
+
+    help_message = \
+"""usage
+  test [--help] PATHS...
+
+flags
+  --help  -h  displays this message
+
+parameters
+  PATHS...  string  some paths"""
+    assert parser.help() == help_message
+
+    @parser.command()
+    def other_command(*paths):
+        pass
+
+    assert parser.get_command("other-command").usage(root=True) == """usage
+  test [--help] [PATHS...]"""
+
+
+def test_variadic_flags():
+    parser = Parser("test", raise_exceptions=True)
+
+    @parser.command()
+    def command(*paths, force = None):
+        return (paths, force)
+    
+    # Flags can't follow values, unless after a lone '--'
+    try:
+        parser.run(["a", "--force"])
+    except ParseException as error:
+        assert f"{error}" == "'--force' follows a parameter"
+    else:
+        assert False
+
+    assert parser.run(["--force", "--", "a", "--force", "-"]) == \
+            (("a", "--force", "-"), True)
+    assert parser.run(["a", "--", "-b"]) == (("a", "-b"), False)